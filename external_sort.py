@@ -0,0 +1,138 @@
+"""
+External merge sort for files larger than memory.
+
+    python external_sort.py input.txt output.txt
+
+The input is read in runs that fit in the memory budget, every run is
+sorted in memory with hybrid_sort and spilled to a temporary file, then the
+runs are merged with a heap (heapq.merge) through buffered readers. When
+there are more than `fan_in` runs, several merge passes are made.
+
+Records are either text lines (compared as bytes) or fixed-width binary
+records of `record_size` bytes read through a memory map.
+"""
+import heapq
+import mmap
+import os
+import tempfile
+from collections import namedtuple
+
+from sorting_algorithms import hybrid_sort
+
+ExternalSortStats = namedtuple("ExternalSortStats",
+                               "records, runs, merge_passes")
+
+# bytes object header plus the list slot pointing to it
+RECORD_OVERHEAD = 41
+BUFFER_SIZE = 1 << 20
+
+
+def _line_runs(path, memory):
+    """ Yield lists of lines whose total size stays within memory """
+    run, size = [], 0
+    with open(path, "rb", buffering=BUFFER_SIZE) as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                line += b"\n"
+            run.append(line)
+            size += len(line) + RECORD_OVERHEAD
+            if size >= memory:
+                yield run
+                run, size = [], 0
+    if run:
+        yield run
+
+
+def _record_runs(path, record_size, memory):
+    """ Yield lists of fixed-width records read through a memory map """
+    file_size = os.path.getsize(path)
+    if file_size % record_size:
+        raise ValueError(f"{path} size is not a multiple of {record_size}")
+    if file_size == 0:
+        return
+    per_run = max(1, memory // (record_size + RECORD_OVERHEAD))
+    with open(path, "rb") as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for start in range(0, file_size, per_run * record_size):
+            stop = min(start + per_run * record_size, file_size)
+            yield [mm[i:i + record_size]
+                   for i in range(start, stop, record_size)]
+
+
+def _read_records(path, record_size):
+    """ Stream the records of a run file """
+    with open(path, "rb", buffering=BUFFER_SIZE) as f:
+        if record_size is None:
+            yield from f
+        else:
+            while True:
+                record = f.read(record_size)
+                if not record:
+                    return
+                yield record
+
+
+def _write_records(path, records):
+    with open(path, "wb", buffering=BUFFER_SIZE) as f:
+        f.writelines(records)
+
+
+def external_sort(input_path, output_path, memory=64 * 2**20, tmpdir=None,
+                  record_size=None, fan_in=64, key=None, reverse=False):
+    """ Sort the records of input_path into output_path.
+
+    memory is the budget in bytes for one in-memory run, tmpdir the
+    directory of the spill files (default: the system one) and fan_in the
+    maximum number of runs merged at once. With record_size=None records
+    are text lines, otherwise fixed-width binary records. key and reverse
+    work as in sorted(); the sort is stable.
+
+    Return an ExternalSortStats(records, runs, merge_passes).
+    """
+    if fan_in < 2:
+        raise ValueError("fan_in must be at least 2")
+    if record_size is None:
+        runs = _line_runs(input_path, memory)
+    else:
+        runs = _record_runs(input_path, record_size, memory)
+
+    with tempfile.TemporaryDirectory(dir=tmpdir) as workdir:
+        paths, records = [], 0
+        for run in runs:
+            hybrid_sort(run, key=key, reverse=reverse)
+            path = os.path.join(workdir, f"run{len(paths)}")
+            _write_records(path, run)
+            paths.append(path)
+            records += len(run)
+        n_runs = len(paths)
+
+        merge_passes = 0
+        while len(paths) > fan_in:
+            merge_passes += 1
+            merged = []
+            for i in range(0, len(paths), fan_in):
+                group = paths[i:i + fan_in]
+                path = os.path.join(workdir, f"pass{merge_passes}-{i}")
+                _write_records(path, heapq.merge(
+                    *[_read_records(p, record_size) for p in group],
+                    key=key, reverse=reverse))
+                for p in group:
+                    os.remove(p)
+                merged.append(path)
+            paths = merged
+
+        merge_passes += 1
+        _write_records(output_path, heapq.merge(
+            *[_read_records(p, record_size) for p in paths],
+            key=key, reverse=reverse))
+
+    return ExternalSortStats(records, n_runs, merge_passes)
+
+
+if __name__ == "__main__":
+
+    import sys
+
+    stats = external_sort(sys.argv[1], sys.argv[2])
+    print(f"{stats.records} records, {stats.runs} runs, "
+          f"{stats.merge_passes} merge passes")
@@ -0,0 +1,190 @@
+"""
+Euclidean division and GCD of polynomials given by their coefficient lists,
+in increasing degree order.
+
+- long division, one vectorised update per quotient coefficient;
+- division by Newton iteration (method="newton"): the reversed divisor is
+  inverted as a power series, doubling the precision at each step, and the
+  quotient is a product, so the division costs a few fast multiplications.
+  The coefficients of the inverse series grow exponentially for most
+  divisors with integer or float coefficients (the quotient only stays
+  small by cancellation): it was much slower than long division for
+  integers and overflowed for floats in all our measurements, so long
+  division remains the default;
+- the GCD of integer polynomials uses the subresultant pseudo-remainder
+  sequence, which keeps the coefficients integral and small, and the
+  Euclidean algorithm for the other coefficient types.
+
+Integer coefficients are never turned into floats: the division of integer
+polynomials returns Fraction coefficients when the divisor is not monic.
+"""
+from fractions import Fraction
+from math import gcd
+from functools import reduce
+
+import numpy as np
+
+try:
+    from .multiplication import multiply
+except ImportError:  # imported by polynomial.py run as a script
+    from multiplication import multiply
+
+
+def _array(coeffs):
+    """ float64 array for floats, object array (exact) for anything else """
+    if isinstance(coeffs, np.ndarray):
+        coeffs = coeffs.tolist()
+    coeffs = list(coeffs)
+    types = set(map(type, coeffs))
+    if float in types and types <= {int, float}:
+        return np.array(coeffs, dtype=float)
+    res = np.empty(len(coeffs), dtype=object)
+    res[:] = coeffs
+    return res
+
+
+def trim(coeffs):
+    """ Remove the zero coefficients of highest degree """
+    n = len(coeffs)
+    while n and coeffs[n - 1] == 0:
+        n -= 1
+    return coeffs[:n]
+
+
+def _div(x, y):
+    """ x / y, exact for integers """
+    if y == 1 or y == -1:
+        return x * y
+    if isinstance(x, int) and isinstance(y, int):
+        q = Fraction(x, y)
+        return q.numerator if q.denominator == 1 else q
+    return x / y
+
+
+def divmod_coeffs(a, b, method="long"):
+    """ Return (q, r) with a = q*b + r and len(r) < len(b),
+    method is "long" or "newton" """
+    b = trim(_array(b))
+    if len(b) == 0:
+        raise ZeroDivisionError("polynomial division by zero")
+    r = trim(_array(a))
+    if r.dtype != b.dtype:
+        r, b = r.astype(object), b.astype(object)
+    m = len(b) - 1
+    if len(r) <= m:
+        return [], r.tolist()
+    if method == "newton":
+        return _newton_divmod(r.tolist(), b.tolist())
+    if method != "long":
+        raise ValueError(f"unknown method {method!r}")
+
+    lead = b[-1]
+    q = np.zeros(len(r) - m, dtype=r.dtype)
+    for k in range(len(r) - 1, m - 1, -1):
+        c = _div(r[k], lead)
+        q[k - m] = c
+        r[k - m:k + 1] -= c * b
+    return q.tolist(), trim(r[:m]).tolist()
+
+
+def _truncated_mul(p, q, k):
+    """ p * q mod x^k, padded to k coefficients """
+    res = multiply(p[:k], q[:k])[:k]
+    return res + [0] * (k - len(res))
+
+
+def inverse_series(f, k):
+    """ g such that f * g = 1 mod x^k, by Newton iteration g <- g (2 - f g) """
+    g = [_div(1, f[0])]
+    n = 1
+    while n < k:
+        n = min(2 * n, k)
+        e = [-c for c in _truncated_mul(f, g, n)]
+        e[0] += 2
+        g = _truncated_mul(g, e, n)
+    return g
+
+
+def _newton_divmod(a, b):
+    """ Fast division: rev(q) = rev(a) / rev(b) mod x^(deg a - deg b + 1) """
+    m = len(b) - 1
+    k = len(a) - m
+    inverse = inverse_series(b[::-1], k)
+    q = _truncated_mul(a[::-1], inverse, k)[::-1]
+    qb = multiply(q, b)
+    return q, trim([a[i] - qb[i] for i in range(m)])
+
+
+def _content(p):
+    return reduce(gcd, p, 0)
+
+
+def _primitive(p):
+    c = _content(p)
+    if p[-1] < 0:
+        c = -c
+    return [x // c for x in p]
+
+
+def _pseudo_remainder(a, b):
+    """ lc(b)^(deg a - deg b + 1) * a mod b, computed without division """
+    r = list(a)
+    lead = b[-1]
+    e = len(a) - len(b) + 1
+    while len(r) >= len(b):
+        c, shift = r[-1], len(r) - len(b)
+        r = [lead * x for x in r]
+        for i, x in enumerate(b):
+            r[shift + i] -= c * x
+        r = trim(r)
+        e -= 1
+    return [x * lead ** e for x in r]
+
+
+def subresultant_gcd(a, b):
+    """ GCD of integer polynomials, primitive with a positive leading
+    coefficient times the gcd of the contents """
+    a, b = trim([int(x) for x in a]), trim([int(x) for x in b])
+    if not a or not b:
+        p = a or b
+        return [_content(p) * x for x in _primitive(p)] if p else []
+    if len(a) < len(b):
+        a, b = b, a
+    content = gcd(_content(a), _content(b))
+    a, b = _primitive(a), _primitive(b)
+    g = h = 1
+    while True:
+        delta = len(a) - len(b)
+        r = _pseudo_remainder(a, b)
+        if not r:
+            break
+        if len(r) == 1:
+            b = [1]
+            break
+        a, b = b, [x // (g * h ** delta) for x in r]
+        g = a[-1]
+        h = g ** delta // h ** (delta - 1) if delta else h
+    return [content * x for x in _primitive(b)]
+
+
+def gcd_coeffs(a, b, tol=1e-10):
+    """ Greatest common divisor: integer polynomials give a primitive
+    integer result, the others a monic one. For floats, the remainder
+    coefficients smaller than tol times the largest are considered zero. """
+    a, b = _array(a), _array(b)
+    if all(isinstance(x, int) for x in a.tolist() + b.tolist()):
+        return subresultant_gcd(a.tolist(), b.tolist())
+    # object coefficients can mix floats with exact numbers: the remainders
+    # are then floats and need the scale too
+    scale = max((abs(float(x)) for x in a.tolist() + b.tolist()), default=0)
+    if a.dtype == float or b.dtype == float:
+        a, b = a.astype(float), b.astype(float)
+        a[np.abs(a) <= tol * scale] = 0
+        b[np.abs(b) <= tol * scale] = 0
+    a, b = trim(a).tolist(), trim(b).tolist()
+    while b:
+        r = np.asarray(divmod_coeffs(a, b)[1])
+        if r.dtype == float and len(r):
+            r[np.abs(r) <= tol * scale] = 0
+        a, b = b, trim(r.tolist())
+    return [_div(x, a[-1]) for x in a] if a else []
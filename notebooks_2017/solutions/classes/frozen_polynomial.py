@@ -0,0 +1,109 @@
+"""
+Immutable polynomials, usable as dictionary keys and in caches.
+
+A FrozenPolynomial owns a read-only copy of its coefficients and computes
+its hash once. `FrozenPolynomial.intern` returns a shared instance for
+identical coefficients: the table only keeps weak references, so an entry
+disappears with the last polynomial using it.
+
+Products and derivatives of frozen polynomials are memoised in an LRU cache
+of CACHE_SIZE entries keyed by the operands, and are interned themselves.
+"""
+import weakref
+from functools import lru_cache
+
+try:
+    from .division import trim
+    from .multiplication import multiply
+    from .polynomial import Polynomial, as_coefficients
+except ImportError:  # run as a script: python frozen_polynomial.py
+    from division import trim
+    from multiplication import multiply
+    from polynomial import Polynomial, as_coefficients
+
+CACHE_SIZE = 1024
+
+
+class FrozenPolynomial(Polynomial):
+    """ Polynomial that cannot be modified """
+
+    __slots__ = ("_hash", "__weakref__")
+
+    _table = weakref.WeakValueDictionary()
+
+    def __init__(self, coefficients):
+        if isinstance(coefficients, Polynomial):
+            coefficients = coefficients.coeffs
+        coeffs = as_coefficients(coefficients).copy()
+        coeffs.flags.writeable = False
+        object.__setattr__(self, "coeffs", coeffs)
+        object.__setattr__(self, "degree", len(coeffs))
+        # equal polynomials have equal hashes: 1 and 1.0 hash the same, and
+        # zero coefficients of highest degree are left out as by ==
+        object.__setattr__(self, "_hash", hash(tuple(trim(coeffs).tolist())))
+
+    @classmethod
+    def intern(cls, coefficients):
+        """ Return the shared FrozenPolynomial with these coefficients """
+        p = coefficients
+        if not isinstance(p, cls):
+            p = cls(coefficients)
+        key = (p.coeffs.dtype.str, tuple(p.coeffs.tolist()))
+        return cls._table.setdefault(key, p)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    __delattr__ = __setattr__
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if isinstance(other, FrozenPolynomial) and self._hash != other._hash:
+            return False
+        return super().__eq__(other)
+
+    def __reduce__(self):
+        return type(self), (self.coeffs,)
+
+    def thaw(self):
+        """ Return a mutable Polynomial copy """
+        return Polynomial(self.coeffs.copy())
+
+    def diff(self, n):
+        return _derivative(self, self.coeffs.dtype.str, n)
+
+    def __mul__(self, other):
+        if isinstance(other, FrozenPolynomial):
+            return _product(self, self.coeffs.dtype.str,
+                            other, other.coeffs.dtype.str)
+        return super().__mul__(other)
+
+
+# the dtypes are part of the keys: P == Q does not mean the same coefficients
+# type, [1, 2] and [1.0, 2.0] are equal but must not share their results
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _product(p, p_dtype, q, q_dtype):
+    return FrozenPolynomial.intern(multiply(p.coeffs, q.coeffs))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _derivative(p, dtype, n):
+    return FrozenPolynomial.intern(Polynomial.diff(p, n))
+
+
+def clear_caches():
+    """ Empty the product and derivative caches """
+    _product.cache_clear()
+    _derivative.cache_clear()
+
+
+if __name__ == "__main__":
+    P = FrozenPolynomial.intern([-3, -1, 1, -1, 4])
+    Q = FrozenPolynomial.intern([-3, -1, 1, -1, 4])
+    print(P is Q, hash(P) == hash(Q), {P: "P"}[Q])
+    print(P * Q)
+    print(P.diff(2), P.diff(2) is Q.diff(2))
+    print(_product.cache_info())
@@ -0,0 +1,118 @@
+"""
+Polynomial multiplication engine.
+
+Coefficients are given in increasing degree order, [1, 5, -4] => 1+5x-4x^2.
+`multiply` chooses the algorithm from the size and the type of the
+coefficients:
+
+- schoolbook double loop for small polynomials;
+- Kronecker substitution for integers: both polynomials are packed in one
+  big Python integer, the product is computed by CPython's big integer
+  multiplication and unpacked. The result is exact whatever the size of the
+  coefficients;
+- numpy FFT convolution for floats;
+- Karatsuba for any other coefficient type (Rational, Fraction...).
+"""
+import numpy as np
+
+SCHOOLBOOK_CUTOFF = 32
+
+
+def schoolbook_mul(p, q):
+    """ O(len(p) * len(q)) product """
+    res = [0] * (len(p) + len(q) - 1)
+    for s_p, s_c in enumerate(p):
+        for q_p, q_c in enumerate(q):
+            res[s_p + q_p] += s_c * q_c
+    return res
+
+
+def karatsuba_mul(p, q):
+    """ O(n^1.58) product, only uses +, - and * on the coefficients """
+    p, q = list(p), list(q)
+    if len(p) < len(q):
+        p, q = q, p
+    if len(q) <= SCHOOLBOOK_CUTOFF:
+        return schoolbook_mul(p, q)
+    if 2 * len(q) <= len(p):
+        # unbalanced: cut p in slices of the size of q
+        res = [0] * (len(p) + len(q) - 1)
+        for start in range(0, len(p), len(q)):
+            for i, c in enumerate(karatsuba_mul(p[start:start + len(q)], q)):
+                res[start + i] += c
+        return res
+
+    m = len(q) // 2
+    p0, p1 = p[:m], p[m:]
+    q0, q1 = q[:m], q[m:]
+    z0 = karatsuba_mul(p0, q0)
+    z2 = karatsuba_mul(p1, q1)
+    z1 = karatsuba_mul(_add(p0, p1), _add(q0, q1))
+    res = [0] * (len(p) + len(q) - 1)
+    for i, c in enumerate(z0):
+        res[i] += c
+        res[i + m] -= c
+    for i, c in enumerate(z2):
+        res[i + 2 * m] += c
+        res[i + m] -= c
+    for i, c in enumerate(z1):
+        res[i + m] += c
+    return res
+
+
+def _add(p, q):
+    if len(p) < len(q):
+        p, q = q, p
+    return [c + d for c, d in zip(p, q)] + p[len(q):]
+
+
+def _pack(coeffs, nbytes):
+    """ sum(c * 256**(nbytes*i)) for non negative integers c """
+    return int.from_bytes(b"".join(c.to_bytes(nbytes, "little")
+                                   for c in coeffs), "little")
+
+
+def kronecker_mul(p, q):
+    """ Exact product of integer polynomials by Kronecker substitution """
+    p, q = [int(c) for c in p], [int(c) for c in q]
+    n = len(p) + len(q) - 1
+    bound = max(map(abs, p)) * max(map(abs, q)) * min(len(p), len(q))
+    # one slot per coefficient, wide enough for the sign and the bound
+    nbytes = (bound.bit_length() + 2 + 7) // 8
+    half = 1 << (8 * nbytes - 1)
+
+    def packed(coeffs):
+        return (_pack([max(c, 0) for c in coeffs], nbytes) -
+                _pack([max(-c, 0) for c in coeffs], nbytes))
+
+    # shifting every slot by half makes all the digits non negative
+    product = packed(p) * packed(q) + _pack([half] * n, nbytes)
+    data = product.to_bytes(n * nbytes, "little")
+    return [int.from_bytes(data[i:i + nbytes], "little") - half
+            for i in range(0, n * nbytes, nbytes)]
+
+
+def fft_mul(p, q):
+    """ Floating point product by FFT convolution, O(n log n) """
+    n = len(p) + len(q) - 1
+    size = 1 << (n - 1).bit_length()
+    fp = np.fft.rfft(np.asarray(p, dtype=float), size)
+    fq = np.fft.rfft(np.asarray(q, dtype=float), size)
+    return np.fft.irfft(fp * fq, size)[:n].tolist()
+
+
+def multiply(p, q):
+    """ Product of the polynomials of coefficients p and q """
+    # numpy arrays are converted to Python scalars: int64 products overflow
+    p = p.tolist() if isinstance(p, np.ndarray) else list(p)
+    q = q.tolist() if isinstance(q, np.ndarray) else list(q)
+    if len(p) == 0 or len(q) == 0:
+        return []
+    if min(len(p), len(q)) <= SCHOOLBOOK_CUTOFF:
+        return schoolbook_mul(p, q)
+    types = set(map(type, p)) | set(map(type, q))
+    if types == {int}:
+        return kronecker_mul(p, q)
+    if types <= {int, float}:
+        return fft_mul(p, q)
+    return karatsuba_mul(p, q)
@@ -1,60 +1,468 @@
+import math
+import re
+import struct
+from fractions import Fraction
+
+import numpy as np
+
+try:
+    from .division import _div, divmod_coeffs, gcd_coeffs, trim
+    from .multiplication import SCHOOLBOOK_CUTOFF, multiply
+except ImportError:  # run as a script: python polynomial.py
+    from division import _div, divmod_coeffs, gcd_coeffs, trim
+    from multiplication import SCHOOLBOOK_CUTOFF, multiply
+
+INT64_MAX = 2**63 - 1
+
+# below this number of int64 or float64 coefficients a numpy call costs
+# more than the work it does: +, - and diff work on Python lists converted
+# back with an overflow check. The numpy operations win above about 100
+# coefficients.
+SMALL_DEGREE = 64
+
+
+def as_coefficients(coefficients):
+    """ Return coefficients as a contiguous 1-D numpy array.
+
+    Integers are stored as int64 and floats as float64 when they fit,
+    anything else (big integers, Rational, Fraction...) in an object array.
+    """
+    if isinstance(coefficients, np.ndarray) and coefficients.dtype != object:
+        if coefficients.dtype.kind in "biu":
+            if coefficients.dtype.kind != "u" or \
+                    len(coefficients) == 0 or coefficients.max() <= INT64_MAX:
+                return np.ascontiguousarray(coefficients, dtype=np.int64)
+            return np.array(coefficients.tolist(), dtype=object)
+        if coefficients.dtype.kind == "f":
+            return np.ascontiguousarray(coefficients, dtype=np.float64)
+        return np.ascontiguousarray(coefficients)
+
+    items = list(coefficients)
+    types = set(map(type, items))
+    if types <= {int}:
+        try:
+            return np.array(items, dtype=np.int64)
+        except OverflowError:
+            pass
+    elif types <= {int, float} and \
+            all(abs(c) <= 2**53 for c in items if type(c) is int):
+        return np.array(items, dtype=np.float64)
+    res = np.empty(len(items), dtype=object)
+    res[:] = items
+    return res
+
+
+def _max_abs(coeffs):
+    if coeffs.size == 0:
+        return 0
+    if coeffs.size <= SMALL_DEGREE:
+        values = coeffs.ravel().tolist()
+        return max(int(max(values)), -int(min(values)))
+    return max(int(coeffs.max()), -int(coeffs.min()))
+
+
+def _exact(coeffs, bound):
+    """ int64 coeffs, as an object array if the result could reach bound """
+    if bound > INT64_MAX:
+        return coeffs.astype(object)
+    return coeffs
+
+
+def _horner_exact(coeffs, x):
+    """ int64 coeffs and x, as object arrays if the Horner scheme could
+    overflow: the values are bounded by max|c| * sum max|x|^k """
+    if coeffs.dtype == np.int64 and x.dtype.kind in "biu" and x.size:
+        m = max(int(x.max()), -int(x.min()), 1)
+        n = coeffs.shape[-1]
+        powers = n if m == 1 else (m ** n - 1) // (m - 1)
+        if _max_abs(coeffs) * powers > INT64_MAX:
+            return coeffs.astype(object), x.astype(object)
+    return coeffs, x
+
+
+def falling_factorials(n, stop):
+    """ [k (k-1) ... (k-n+1) for k in range(n, stop)], exact integers
+
+    Each term is deduced from the previous one by a multiplication and an
+    exact division, O(stop) operations instead of O(n * stop).
+    """
+    if stop <= n:
+        return []
+    factors = []
+    f = math.factorial(n)
+    for k in range(n, stop):
+        factors.append(f)
+        f = f * (k + 1) // (k + 1 - n)
+    return factors
+
+
+def _times_factors(coeffs, factors):
+    """ coeffs * factors along the last axis, without overflow.
+
+    Float factors can exceed 2**1024: they are split into a mantissa and a
+    power of 2, applied by ldexp after the product. Zero coefficients stay
+    zero and the products that fit in a float stay finite.
+    """
+    if coeffs.dtype.kind in "fc":
+        shifts = [max(f.bit_length() - 64, 0) for f in factors]
+        mantissas = np.array([f / (1 << s) for f, s in zip(factors, shifts)])
+        shifts = np.array(shifts, dtype=np.int64)
+        products = coeffs * mantissas
+        with np.errstate(over="ignore"):  # inf, as for Python floats
+            if coeffs.dtype.kind == "c":
+                products.real = np.ldexp(products.real, shifts)
+                products.imag = np.ldexp(products.imag, shifts)
+                return products
+            return np.ldexp(products, shifts)
+    if coeffs.dtype == object or (factors and factors[-1] > INT64_MAX):
+        return coeffs * np.array(factors, dtype=object)
+    return coeffs * np.array(factors, dtype=np.int64)
+
+
+def _signed(c):
+    """ c preceded by its sign, as the {:+d} format does for integers """
+    if isinstance(c, (int, np.integer)):
+        return format(int(c), "+d")
+    if isinstance(c, float):
+        return format(c, "+")
+    text = str(c)
+    return text if text.startswith("-") else "+" + text
+
+
+def _term(e, c):
+    if e == 0:
+        return " {0} ".format(_signed(c))
+    if e == 1:
+        return " {0}x ".format(_signed(c))
+    return " {0}x^{1} ".format(_signed(c), e)
+
+
+def _texts(terms):
+    if all(type(c) in (int, float) for _, c in terms):
+        texts = [f" {c:+}x^{e} " for e, c in terms]
+    else:
+        texts = [" {0}x^{1} ".format(_signed(c), e) for e, c in terms]
+    # the terms are sorted: the constant and linear ones come first
+    for i, (e, c) in enumerate(terms[:2]):
+        if e < 2:
+            texts[i] = _term(e, c)
+    return texts
+
+
+def format_terms(terms, max_terms=None):
+    """ Text of the [(exponent, coefficient)] terms sorted by exponent,
+    " +3  -1x  +1x^2 ".
+
+    With more than max_terms terms, only the first and the last ones are
+    written around the number of terms left out.
+    """
+    terms = list(terms)
+    if not terms:
+        return "0"
+    if max_terms is not None and len(terms) > max_terms:
+        head, tail = (max_terms + 1) // 2, max_terms // 2
+        return "".join(_texts(terms[:head]) +
+                       [" ... {0} terms ... ".format(len(terms) - max_terms)] +
+                       _texts(terms[len(terms) - tail:]))
+    return "".join(_texts(terms))
+
+
+# one term: optional sign, optional coefficient (p/q, integer or float),
+# optional x^exponent
+_TERM = re.compile(r"""\s*(?P<sign>[+-]?)\s*
+                       (?P<coeff>\d+\s*/\s*\d+|
+                                 (?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)?
+                       \s*\*?\s*
+                       (?P<x>x(?:\s*(?:\^|\*\*)\s*(?P<exp>\d+))?)?\s*""",
+                   re.VERBOSE)
+
+
+def parse_terms(text):
+    """ Return {exponent: coefficient} read from "+3 -1x +1/2x^2" or
+    "3 - x + x**2", p/q coefficients as Fraction; raise ValueError if text
+    is not a polynomial """
+    terms = {}
+    pos = 0
+    while pos < len(text):
+        match = _TERM.match(text, pos)
+        coeff, x = match["coeff"], match["x"]
+        if not (coeff or x) or (pos and not match["sign"]):
+            raise ValueError(f"invalid polynomial {text!r} at {pos}")
+        if coeff is None:
+            c = 1
+        elif "/" in coeff:
+            c = Fraction(*map(int, coeff.split("/")))
+        elif any(char in coeff for char in ".eE"):
+            c = float(coeff)
+        else:
+            c = int(coeff)
+        if match["sign"] == "-":
+            c = -c
+        e = 0 if x is None else int(match["exp"] or 1)
+        terms[e] = terms.get(e, 0) + c
+        pos = match.end()
+    return {e: c for e, c in terms.items() if c != 0}
+
+
 class Polynomial:
     """ Polynomial """
 
+    __slots__ = ("coeffs", "degree")
+
     def __init__(self, coefficients):
-        self.coeffs = coefficients
-        self.degree = len(coefficients)
+        self.coeffs = as_coefficients(coefficients)
+        self.degree = len(self.coeffs)
+
+    @classmethod
+    def _wrap(cls, coeffs):
+        """ Polynomial of a result array: int64 and float64 arrays are
+        already in the as_coefficients form and are not checked again """
+        if coeffs.dtype != np.int64 and coeffs.dtype != np.float64:
+            return cls(coeffs)
+        self = object.__new__(cls)
+        self.coeffs = coeffs
+        self.degree = len(coeffs)
+        return self
+
+    @classmethod
+    def _from_list(cls, values, dtype):
+        """ Polynomial of a list of results computed from dtype arrays,
+        as an object array if they overflow dtype """
+        try:
+            return cls._wrap(np.array(values, dtype=dtype))
+        except OverflowError:
+            return cls(values)
+
+    def _small(self, *others):
+        """ dtype if self and others have the same int64 or float64 dtype
+        and at most SMALL_DEGREE coefficients, else None """
+        dtype = self.coeffs.dtype
+        if self.degree > SMALL_DEGREE or \
+                dtype != np.int64 and dtype != np.float64:
+            return None
+        for other in others:
+            if other.degree > SMALL_DEGREE or other.coeffs.dtype != dtype:
+                return None
+        return dtype
 
     def diff(self, n):
-        """ Return the nth derivative """
-        coeffs = self.coeffs[:]
-        for k in range(n):
-            coeffs = [i * coeffs[i] for i in range(1, len(coeffs))]
-        return Polynomial(coeffs)
+        """ Return the nth derivative, in a single pass: the coefficient
+        of x^k is multiplied by k (k-1) ... (k-n+1) """
+        dtype = self._small()
+        if dtype is not None:
+            # n passes over a short list cost less than the factors array,
+            # and the list is empty after len(coeffs) passes
+            coeffs = self.coeffs.tolist()
+            for _ in range(min(n, len(coeffs))):
+                coeffs = [k * coeffs[k] for k in range(1, len(coeffs))]
+            return Polynomial._from_list(coeffs, dtype)
+        if n >= self.degree:
+            return Polynomial(self.coeffs[:0])
+        factors = falling_factorials(n, self.degree)
+        coeffs = self.coeffs[n:]
+        if coeffs.dtype == np.int64:
+            coeffs = _exact(coeffs, _max_abs(coeffs) * factors[-1])
+        return Polynomial._wrap(_times_factors(coeffs, factors))
+
+    def integrate(self, n=1):
+        """ Return the nth antiderivative vanishing at 0 with its first
+        n - 1 derivatives. Integer coefficients give exact fractions. """
+        factors = falling_factorials(n, self.degree + n)
+        coeffs = self.coeffs
+        if coeffs.dtype == np.float64:
+            coeffs = (coeffs / np.array(factors, dtype=float)).tolist()
+        else:
+            coeffs = [_div(c, f) for c, f in zip(coeffs.tolist(), factors)]
+        return Polynomial([0] * n + coeffs)
+
+    def integral(self, a, b):
+        """ Definite integral from a to b """
+        antiderivative = self.integrate()
+        return antiderivative(b) - antiderivative(a)
+
+    def __call__(self, x):
+        """ Evaluate with the Horner scheme.
+
+        x can be a number, a list or a numpy array: all the points of an
+        array are evaluated together, one vectorised pass per coefficient.
+        """
+        if isinstance(x, (list, tuple)):
+            return self(np.asarray(x)).tolist()
+        if not isinstance(x, np.ndarray):
+            result = 0
+            for c in reversed(self.coeffs.tolist()):
+                result = result * x + c
+            return result
+
+        coeffs, x = _horner_exact(self.coeffs, x)
+        result = np.zeros(x.shape, dtype=np.result_type(coeffs, x))
+        for c in coeffs[::-1]:
+            result *= x
+            result += c
+        return result
 
     def __repr__(self):
-        output = ""
-        for i, c in enumerate(self.coeffs):
-            if c != 0:
-                if i == 0:
-                    output += " {0:+d} ".format(c)
-                elif i == 1:
-                    output += " {0:+d}x ".format(c)
-                else:
-                    output += " {0:+d}x^{1} ".format(c, i)
-
-        if len(output) == 0: return "0"
-        return output
+        return self.to_string()
+
+    def to_string(self, max_terms=None):
+        """ Text of the non zero terms, at most max_terms of them """
+        exponents = np.flatnonzero(self.coeffs)
+        return format_terms(zip(exponents.tolist(),
+                                self.coeffs[exponents].tolist()), max_terms)
+
+    @classmethod
+    def from_string(cls, text):
+        """ Inverse of repr: Polynomial.from_string(" +3  -1x  +1x^2 ").
+        Integer, float and rational coefficients are read back, the last as
+        Fraction; the result has no zero coefficients of highest degree """
+        terms = parse_terms(text)
+        coeffs = [0] * (max(terms, default=-1) + 1)
+        for e, c in terms.items():
+            coeffs[e] = c
+        return cls(coeffs)
+
+    def to_bytes(self):
+        """ Binary form: the length of the dtype name, the dtype name, then
+        the little-endian coefficients. Integers too big for int64 are
+        written with dtype "int", each preceded by its number of bytes. """
+        coeffs = self.coeffs
+        if coeffs.dtype != object:
+            dtype = coeffs.dtype.newbyteorder("<")
+            header = dtype.str.encode()
+            return bytes([len(header)]) + header + \
+                coeffs.astype(dtype, copy=False).tobytes()
+        chunks = [b"\x03int"]
+        for c in coeffs.tolist():
+            if not isinstance(c, int):
+                raise TypeError("only int and float coefficients can be "
+                                f"written as bytes, not {type(c).__name__}")
+            size = c.bit_length() // 8 + 1
+            chunks.append(struct.pack("<I", size))
+            chunks.append(c.to_bytes(size, "little", signed=True))
+        return b"".join(chunks)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """ Inverse of to_bytes """
+        data = memoryview(data)
+        start = data[0] + 1
+        dtype = bytes(data[1:start]).decode()
+        if dtype != "int":
+            return cls(np.frombuffer(data[start:], dtype=dtype).copy())
+        coeffs = []
+        while start < len(data):
+            size, = struct.unpack_from("<I", data, start)
+            start += 4
+            coeffs.append(int.from_bytes(data[start:start + size], "little",
+                                         signed=True))
+            start += size
+        return cls(coeffs)
 
     def __eq__(self, other):  # override '=='
-        return self.coeffs == other.coeffs
+        if not isinstance(other, Polynomial):
+            return NotImplemented
+        # zero coefficients of highest degree do not change the polynomial
+        return np.array_equal(trim(self.coeffs), trim(other.coeffs))
 
     def __add__(self, other):  # ( P + Q )
-        if self.degree < other.degree:
-            coeffs = self.coeffs + [0] * (other.degree - self.degree)
-            return Polynomial([c + q for c, q in zip(other.coeffs, coeffs)])
-        else:
-            coeffs = other.coeffs + [0] * (self.degree - other.degree)
-            return Polynomial([c + q for c, q in zip(self.coeffs, coeffs)])
+        if not isinstance(other, Polynomial):
+            return NotImplemented
+        long, short = self.coeffs, other.coeffs
+        if len(long) < len(short):
+            long, short = short, long
+        dtype = self._small(other)
+        if dtype is not None:
+            long, short = long.tolist(), short.tolist()
+            return Polynomial._from_list(
+                [c + d for c, d in zip(long, short)] + long[len(short):],
+                dtype)
+        if long.dtype == short.dtype == np.int64:
+            bound = _max_abs(long) + _max_abs(short)
+            long = _exact(long, bound)
+        coeffs = long.astype(np.result_type(long, short))
+        coeffs[:len(short)] += short
+        return Polynomial._wrap(coeffs)
 
     def __neg__(self):
-        return Polynomial([-c for c in self.coeffs])
+        dtype = self._small()
+        if dtype is not None:
+            return Polynomial._from_list([-c for c in self.coeffs.tolist()],
+                                         dtype)
+        coeffs = self.coeffs
+        if coeffs.dtype == np.int64:
+            coeffs = _exact(coeffs, _max_abs(coeffs))
+        return Polynomial._wrap(-coeffs)
 
     def __sub__(self, other):
+        if not isinstance(other, Polynomial):
+            return NotImplemented
+        dtype = self._small(other)
+        if dtype is not None:
+            p, q = self.coeffs.tolist(), other.coeffs.tolist()
+            n = max(len(p), len(q))
+            return Polynomial._from_list(
+                [c - d for c, d in zip(p + [0] * (n - len(p)),
+                                       q + [0] * (n - len(q)))], dtype)
         return self.__add__(-other)
 
     def __mul__(self, other):  # (P * Q) or (alpha * P)
 
         if isinstance(other, Polynomial):
-            _s = self.coeffs
-            _q = other.coeffs
-            res = [0] * (len(_s) + len(_q) - 1)
-            for s_p, s_c in enumerate(_s):
-                for q_p, q_c in enumerate(_q):
-                    res[s_p + q_p] += s_c * q_c
-            return Polynomial(res)
+            p, q = self.coeffs, other.coeffs
+            # instead of the Python schoolbook product of multiply:
+            # np.convolve, exact on int64 while max|p| max|q| min(len(p),
+            # len(q)) fits; floats keep the summation order of multiply
+            short = min(len(p), len(q))
+            if p.dtype == q.dtype == np.int64 and \
+                    0 < short <= SCHOOLBOOK_CUTOFF and \
+                    _max_abs(p) * _max_abs(q) * short <= INT64_MAX:
+                return Polynomial._wrap(np.convolve(p, q))
+            return Polynomial(multiply(p, q))
+        elif hasattr(other, "to_dense"):  # other polynomial forms
+            return NotImplemented
         else:
-            return Polynomial([c * other for c in self.coeffs])
+            coeffs = self.coeffs
+            if coeffs.dtype == np.int64 and \
+                    isinstance(other, (int, np.integer)):
+                coeffs = _exact(coeffs, _max_abs(coeffs) * abs(int(other)))
+            return Polynomial._wrap(coeffs * other)
+
+    def __divmod__(self, other):  # (P // Q, P % Q)
+        if not isinstance(other, Polynomial):
+            return NotImplemented
+        q, r = divmod_coeffs(self.coeffs, other.coeffs)
+        return Polynomial(q), Polynomial(r)
+
+    def __floordiv__(self, other):
+        if not isinstance(other, Polynomial):
+            return NotImplemented
+        return divmod(self, other)[0]
+
+    def __mod__(self, other):
+        if not isinstance(other, Polynomial):
+            return NotImplemented
+        return divmod(self, other)[1]
+
+    def gcd(self, other):
+        """ Greatest common divisor, primitive for integer coefficients,
+        monic otherwise """
+        return Polynomial(gcd_coeffs(self.coeffs, other.coeffs))
+
+
+def evaluate_batch(polynomials, x):
+    """ Evaluate every polynomial at every point of x.
+
+    Return the matrix M[i, j] = polynomials[i](x[j]), computed by the Horner
+    scheme on the padded coefficient matrix (PolynomialBatch.__call__):
+    the zeros of the padding stay zeros, and integer coefficients and
+    points give exact values.
+    """
+    # imported here: polynomial_batch imports this module
+    try:
+        from .polynomial_batch import PolynomialBatch
+    except ImportError:  # run as a script: python polynomial.py
+        from polynomial_batch import PolynomialBatch
+    return PolynomialBatch.from_polynomials(polynomials)(np.asarray(x))
 
 
 if __name__ == "__main__":
@@ -66,3 +474,4 @@ if __name__ == "__main__":
     print(S)
     print(P + Q)
     print(Q + P)
+    print(P(2), P([0, 1, 2]))
@@ -0,0 +1,166 @@
+"""
+Arithmetic on many polynomials at once.
+
+A PolynomialBatch stores N polynomials as the rows of a N x D coefficient
+matrix, padded with zeros, and a vector with the number of coefficients of
+every polynomial (Polynomial.degree). Every operation is a few numpy
+operations on the whole matrix instead of N calls to Polynomial methods.
+
+As for Polynomial, integer coefficients are stored as int64 and the
+matrix switches to an object array when a result could overflow.
+"""
+import numpy as np
+
+try:
+    from .multiplication import SCHOOLBOOK_CUTOFF
+    from .polynomial import (Polynomial, _exact, _horner_exact, _max_abs,
+                             _times_factors, falling_factorials)
+except ImportError:  # run as a script: python polynomial_batch.py
+    from multiplication import SCHOOLBOOK_CUTOFF
+    from polynomial import (Polynomial, _exact, _horner_exact, _max_abs,
+                            _times_factors, falling_factorials)
+
+
+class PolynomialBatch:
+    """ N polynomials stored as a padded coefficient matrix """
+
+    __slots__ = ("coeffs", "degrees")
+
+    def __init__(self, coeffs, degrees=None):
+        coeffs = np.asarray(coeffs)
+        if coeffs.ndim != 2:
+            raise ValueError("coeffs must be a 2-D array")
+        if coeffs.dtype.kind in "biu" and coeffs.dtype != object:
+            coeffs = coeffs.astype(np.int64)
+        self.coeffs = coeffs
+        if degrees is None:
+            degrees = np.full(len(coeffs), coeffs.shape[1])
+        self.degrees = np.asarray(degrees, dtype=np.int64)
+
+    @classmethod
+    def from_polynomials(cls, polynomials):
+        polynomials = list(polynomials)
+        degrees = [p.degree for p in polynomials]
+        dtype = np.result_type(*(p.coeffs for p in polynomials)) \
+            if polynomials else np.int64
+        coeffs = np.zeros((len(polynomials), max(degrees, default=0)),
+                          dtype=dtype)
+        for i, p in enumerate(polynomials):
+            coeffs[i, :p.degree] = p.coeffs
+        return cls(coeffs, degrees)
+
+    def to_polynomials(self):
+        return [Polynomial(row[:d]) for row, d in
+                zip(self.coeffs, self.degrees.tolist())]
+
+    def __len__(self):
+        return len(self.coeffs)
+
+    def __getitem__(self, i):
+        return Polynomial(self.coeffs[i, :self.degrees[i]])
+
+    def __repr__(self):
+        return "\n".join(map(repr, self.to_polynomials()))
+
+    def _pad(self, width):
+        coeffs = self.coeffs
+        if coeffs.shape[1] < width:
+            coeffs = np.pad(coeffs, ((0, 0), (0, width - coeffs.shape[1])))
+        return coeffs
+
+    def _check(self, other):
+        if len(self) != len(other):
+            raise ValueError("batches of different lengths")
+
+    def __add__(self, other):
+        if not isinstance(other, PolynomialBatch):
+            return NotImplemented
+        self._check(other)
+        width = max(self.coeffs.shape[1], other.coeffs.shape[1])
+        p, q = self._pad(width), other._pad(width)
+        if p.dtype == q.dtype == np.int64:
+            bound = _max_abs(p) + _max_abs(q)
+            p = _exact(p, bound)
+        return PolynomialBatch(p + q, np.maximum(self.degrees, other.degrees))
+
+    def __neg__(self):
+        coeffs = self.coeffs
+        if coeffs.dtype == np.int64:
+            coeffs = _exact(coeffs, _max_abs(coeffs))
+        return PolynomialBatch(-coeffs, self.degrees)
+
+    def __sub__(self, other):
+        if not isinstance(other, PolynomialBatch):
+            return NotImplemented
+        return self + (-other)
+
+    def __mul__(self, other):  # (P * Q) or (alpha * P), row by row
+        if isinstance(other, PolynomialBatch):
+            return self._convolve(other)
+        coeffs = self.coeffs
+        if coeffs.dtype == np.int64 and isinstance(other, (int, np.integer)):
+            coeffs = _exact(coeffs, _max_abs(coeffs) * abs(int(other)))
+        return PolynomialBatch(coeffs * other, self.degrees)
+
+    __rmul__ = __mul__
+
+    def _convolve(self, other):
+        self._check(other)
+        p, q = self.coeffs, other.coeffs
+        degrees = np.where((self.degrees == 0) | (other.degrees == 0), 0,
+                           self.degrees + other.degrees - 1)
+        if p.shape[1] == 0 or q.shape[1] == 0:
+            return PolynomialBatch(np.zeros((len(p), 0), dtype=p.dtype),
+                                   degrees)
+        n = p.shape[1] + q.shape[1] - 1
+        if p.dtype.kind == q.dtype.kind == "f" and \
+                min(p.shape[1], q.shape[1]) > SCHOOLBOOK_CUTOFF:
+            size = 1 << (n - 1).bit_length()
+            coeffs = np.fft.irfft(np.fft.rfft(p, size) * np.fft.rfft(q, size),
+                                  size)[:, :n]
+            return PolynomialBatch(coeffs, degrees)
+
+        if p.dtype == q.dtype == np.int64:
+            bound = _max_abs(p) * _max_abs(q) * min(p.shape[1], q.shape[1])
+            p, q = _exact(p, bound), _exact(q, bound)
+        if p.shape[1] < q.shape[1]:
+            p, q = q, p
+        # one vectorised update per column of the narrowest matrix
+        coeffs = np.zeros((len(p), n), dtype=np.result_type(p, q))
+        for j in range(q.shape[1]):
+            coeffs[:, j:j + p.shape[1]] += p * q[:, j:j + 1]
+        return PolynomialBatch(coeffs, degrees)
+
+    def diff(self, n):
+        """ Return the nth derivatives """
+        degrees = np.maximum(self.degrees - n, 0)
+        if n >= self.coeffs.shape[1]:
+            return PolynomialBatch(self.coeffs[:, :0], degrees)
+        coeffs = self.coeffs[:, n:]
+        factors = falling_factorials(n, self.coeffs.shape[1])
+        if coeffs.dtype == np.int64:
+            coeffs = _exact(coeffs, _max_abs(coeffs) * factors[-1])
+        return PolynomialBatch(_times_factors(coeffs, factors), degrees)
+
+    def __call__(self, x):
+        """ Evaluate with the Horner scheme: a number gives the vector of
+        the N values, an array of M points the N x M matrix of values """
+        coeffs, x = _horner_exact(self.coeffs, np.asarray(x))
+        result = np.zeros((len(coeffs),) + x.shape,
+                          dtype=np.result_type(coeffs, x))
+        column = (slice(None),) + (None,) * x.ndim
+        for c in coeffs.T[::-1]:
+            result *= x
+            result += c[column]
+        return result
+
+
+if __name__ == "__main__":
+    B = PolynomialBatch.from_polynomials([Polynomial([-3, -1, 1, -1, 4]),
+                                          Polynomial([1, 2]),
+                                          Polynomial([5])])
+    print(B)
+    print(B.diff(2))
+    print(B * B)
+    print(B + 2 * B)
+    print(B([0, 1, 2]))
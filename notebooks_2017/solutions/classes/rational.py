@@ -1,42 +1,524 @@
+import math
+import numbers
+import operator
+import sys
+from math import gcd
+
+_HASH_MODULUS = sys.hash_info.modulus
+_HASH_INF = sys.hash_info.inf
+
+# RationalAccumulator reduces its sum when the denominator exceeds this
+# number of bits, then when it is twice as big as after the last reduction
+NORMALIZE_BITS = 4096
+
+
+def _normalize(n, d):
+    """ (n, d) divided by their gcd, with a positive denominator """
+    if d == 0:
+        raise ZeroDivisionError(f"Rational({n}, 0)")
+    g = gcd(n, d)
+    if d < 0:
+        g = -g
+    return n // g, d // g
+
+
 class Rational:
     """ Class representing a rational number"""
 
-    def __init__(self, n, d):
-        assert isinstance(n, int)
-        assert isinstance(d, int)
-
-        def gcd(x, y):
-            if x == 0:
-                return y
-            elif x < 0:
-                return gcd(-x, y)
-            elif y < 0:
-                return -gcd(x, -y)
-            else:
-                return gcd(y % x, x)
+    __slots__ = ("numer", "denom", "_hash")
+
+    def __init__(self, n, d=1):
+        if type(n) is not int or type(d) is not int:
+            # numpy integers, Fraction and Rational terms
+            n, d = _terms(n), _terms(d)
+            if n is None or d is None:
+                raise TypeError("Rational terms should be rational numbers,"
+                                " use Rational.from_float for floats")
+            n, d = n[0] * d[1], n[1] * d[0]
+        self.numer, self.denom = _normalize(n, d)
+        self._hash = None
+
+    @classmethod
+    def _reduced(cls, n, d):
+        """ Build n / d without normalisation: n, d coprime and d > 0 """
+        self = object.__new__(cls)
+        self.numer = n
+        self.denom = d
+        self._hash = None
+        return self
+
+    @classmethod
+    def from_float(cls, x, max_denominator=None):
+        """ The exact value of the float x or, with max_denominator, the
+        closest Rational whose denominator is at most max_denominator """
+        n, d = _exact_terms(x)
+        if max_denominator is None or d <= max_denominator:
+            return cls._reduced(n, d)
+        return cls._reduced(*best_approximation(n, d, max_denominator))
+
+    # numbers.Rational interface, so that Fraction accepts Rational operands
+
+    @property
+    def numerator(self):
+        return self.numer
 
-        g = gcd(n, d)
-        self.numer = n // g
-        self.denom = d // g
+    @property
+    def denominator(self):
+        return self.denom
+
+    def as_integer_ratio(self):
+        return self.numer, self.denom
+
+    # The operands are reduced, so the gcds of the results can be computed
+    # on smaller numbers (Henrici): the denominators only share g = gcd(b, d)
+
+    def _add(self, n, d):
+        a, b = self.numer, self.denom
+        g = gcd(b, d)
+        if g == 1:
+            return Rational._reduced(a * d + n * b, b * d)
+        s = b // g
+        t = a * (d // g) + n * s
+        if t == 0:
+            return Rational._reduced(0, 1)
+        g = gcd(t, g)
+        return Rational._reduced(t // g, s * (d // g))
+
+    # Rational operands are read directly, the other types through _terms
 
     def __add__(self, other):
-        return Rational(self.numer * other.denom + other.numer * self.denom,
-                        self.denom * other.denom)
+        if type(other) is Rational:
+            return self._add(other.numer, other.denom)
+        terms = _terms(other)
+        if terms is None:
+            return float(self) + other if isinstance(other, float) \
+                else NotImplemented
+        return self._add(*terms)
+
+    __radd__ = __add__
 
     def __sub__(self, other):
-        return Rational(self.numer * other.denom - other.numer * self.denom,
-                        self.denom * other.denom)
+        if type(other) is Rational:
+            return self._add(-other.numer, other.denom)
+        terms = _terms(other)
+        if terms is None:
+            return float(self) - other if isinstance(other, float) \
+                else NotImplemented
+        return self._add(-terms[0], terms[1])
+
+    def __rsub__(self, other):
+        return (-self) + other
+
+    def _mul(self, n, d):
+        g1 = gcd(self.numer, d)
+        g2 = gcd(n, self.denom)
+        return Rational._reduced((self.numer // g1) * (n // g2),
+                                 (self.denom // g2) * (d // g1))
 
     def __mul__(self, other):
-        return Rational(self.numer * other.numer, self.denom * other.denom)
+        if type(other) is Rational:
+            return self._mul(other.numer, other.denom)
+        terms = _terms(other)
+        if terms is None:
+            return float(self) * other if isinstance(other, float) \
+                else NotImplemented
+        return self._mul(*terms)
+
+    __rmul__ = __mul__
+
+    def _div(self, n, d):
+        if n == 0:
+            raise ZeroDivisionError("division by a zero Rational")
+        if n < 0:
+            return self._mul(-d, -n)
+        return self._mul(d, n)
 
     def __truediv__(self, other):
-        return Rational(self.numer * other.denom, self.denom * other.numer)
+        if type(other) is Rational:
+            return self._div(other.numer, other.denom)
+        terms = _terms(other)
+        if terms is None:
+            return float(self) / other if isinstance(other, float) \
+                else NotImplemented
+        return self._div(*terms)
+
+    def __rtruediv__(self, other):
+        terms = _terms(other)
+        if terms is None:
+            return other / float(self) if isinstance(other, float) \
+                else NotImplemented
+        return Rational._reduced(*terms)._div(self.numer, self.denom)
+
+    def __pow__(self, exponent):
+        if not isinstance(exponent, int):
+            terms = _terms(exponent)
+            if terms is not None and terms[1] == 1:
+                exponent = terms[0]
+            elif terms is not None or isinstance(exponent, float):
+                # irrational in general: computed on floats
+                return float(self) ** float(exponent)
+            else:
+                return NotImplemented
+        if exponent >= 0:
+            return Rational._reduced(self.numer ** exponent,
+                                     self.denom ** exponent)
+        return Rational._reduced(1, 1)._div(self.numer ** -exponent,
+                                            self.denom ** -exponent)
+
+    def __rpow__(self, base):
+        if self.denom == 1:
+            return base ** self.numer
+        if isinstance(base, (int, float)) or _terms(base) is not None:
+            return float(base) ** float(self)
+        return NotImplemented
+
+    # floor division and remainder of a / b by c / d, with b, d > 0:
+    # (a d) // (c b), and the remainder over b d
+
+    def _divmod(self, n, d):
+        if n == 0:
+            raise ZeroDivisionError("division by a zero Rational")
+        q, r = divmod(self.numer * d, n * self.denom)
+        return q, Rational(r, self.denom * d)
+
+    def __floordiv__(self, other):
+        terms = _terms(other)
+        if terms is None:
+            return float(self) // other if isinstance(other, float) \
+                else NotImplemented
+        return self._divmod(*terms)[0]
+
+    def __rfloordiv__(self, other):
+        terms = _terms(other)
+        if terms is None:
+            return other // float(self) if isinstance(other, float) \
+                else NotImplemented
+        return Rational._reduced(*terms)._divmod(self.numer, self.denom)[0]
+
+    def __mod__(self, other):
+        terms = _terms(other)
+        if terms is None:
+            return float(self) % other if isinstance(other, float) \
+                else NotImplemented
+        return self._divmod(*terms)[1]
+
+    def __rmod__(self, other):
+        terms = _terms(other)
+        if terms is None:
+            return other % float(self) if isinstance(other, float) \
+                else NotImplemented
+        return Rational._reduced(*terms)._divmod(self.numer, self.denom)[1]
+
+    def __divmod__(self, other):
+        terms = _terms(other)
+        if terms is None:
+            return divmod(float(self), other) if isinstance(other, float) \
+                else NotImplemented
+        return self._divmod(*terms)
+
+    def __rdivmod__(self, other):
+        terms = _terms(other)
+        if terms is None:
+            return divmod(other, float(self)) if isinstance(other, float) \
+                else NotImplemented
+        return Rational._reduced(*terms)._divmod(self.numer, self.denom)
+
+    def __neg__(self):
+        return Rational._reduced(-self.numer, self.denom)
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return Rational._reduced(abs(self.numer), self.denom)
+
+    def __bool__(self):
+        return self.numer != 0
+
+    def __float__(self):
+        # int / int is correctly rounded, even for huge terms
+        return self.numer / self.denom
+
+    def __int__(self):
+        return -(-self.numer // self.denom) if self.numer < 0 \
+            else self.numer // self.denom
+
+    __trunc__ = __int__
+
+    def __floor__(self):
+        return self.numer // self.denom
+
+    def __ceil__(self):
+        return -(-self.numer // self.denom)
+
+    def __round__(self, ndigits=None):
+        """ Round half to even, to an int or to a Rational with ndigits
+        decimal digits, as Fraction does """
+        if ndigits is None:
+            q, r = divmod(self.numer, self.denom)
+            if 2 * r > self.denom or 2 * r == self.denom and q % 2:
+                q += 1
+            return q
+        shift = 10 ** abs(ndigits)
+        if ndigits > 0:
+            return Rational(round(self * shift), shift)
+        return Rational(round(self / shift) * shift)
+
+    # comparisons of reduced fractions: equal terms, or the cross products
+    # a * d and c * b since the denominators are positive
+
+    def __eq__(self, other):
+        if type(other) is Rational:
+            return self.numer == other.numer and self.denom == other.denom
+        if isinstance(other, float):
+            if not math.isfinite(other):
+                return False
+            other = other.as_integer_ratio()
+        else:
+            other = _terms(other)
+            if other is None:
+                return NotImplemented
+        return self.numer == other[0] and self.denom == other[1]
+
+    def _compare(self, other, op):
+        if type(other) is Rational:
+            return op(self.numer * other.denom, other.numer * self.denom)
+        if isinstance(other, float):
+            if not math.isfinite(other):
+                return op(0, other)
+            other = other.as_integer_ratio()
+        else:
+            other = _terms(other)
+            if other is None:
+                return NotImplemented
+        return op(self.numer * other[1], other[0] * self.denom)
+
+    def __lt__(self, other):
+        return self._compare(other, operator.lt)
+
+    def __le__(self, other):
+        return self._compare(other, operator.le)
+
+    def __gt__(self, other):
+        return self._compare(other, operator.gt)
+
+    def __ge__(self, other):
+        return self._compare(other, operator.ge)
+
+    def __hash__(self):
+        """ Same hash as the equal int, float and Fraction """
+        if self._hash is None:
+            try:
+                inverse = pow(self.denom, -1, _HASH_MODULUS)
+            except ValueError:  # denominator multiple of the modulus
+                h = _HASH_INF
+            else:
+                h = hash(hash(abs(self.numer)) * inverse)
+            h = h if self.numer >= 0 else -h
+            self._hash = -2 if h == -1 else h
+        return self._hash
 
     def __repr__(self):
         return f"{self.numer:d} / {self.denom:d}"
 
 
+numbers.Rational.register(Rational)
+
+
+def _terms(value):
+    """ (numerator, denominator) of an int or a rational, else None """
+    if isinstance(value, int):
+        return value, 1
+    if isinstance(value, numbers.Rational):  # Fraction, numpy integers
+        return int(value.numerator), int(value.denominator)
+    return None
+
+
+def _exact_terms(x):
+    if isinstance(x, float):
+        if not math.isfinite(x):
+            raise ValueError(f"cannot convert {x} to a Rational")
+        return x.as_integer_ratio()
+    terms = _terms(x)
+    if terms is None:
+        raise TypeError(f"cannot convert {type(x).__name__} to a Rational")
+    return terms
+
+
+def convergents(x):
+    """ Yield the convergents p / q of the continued fraction of x, a float
+    or a rational: they are the best approximations of x with a denominator
+    at most q, and the last one is x """
+    n, d = _exact_terms(x)
+    p0, q0, p1, q1 = 0, 1, 1, 0
+    while d:
+        a = n // d
+        p0, q0, p1, q1 = p1, q1, p0 + a * p1, q0 + a * q1
+        n, d = d, n - a * d
+        yield Rational._reduced(p1, q1)
+
+
+def best_approximation(n, d, max_denominator):
+    """ (p, q) with q <= max_denominator and p / q closest to n / d.
+
+    The continued fraction of n / d is expanded until the next convergent
+    denominator exceeds max_denominator; the answer is then the last
+    convergent or the largest semiconvergent below the limit.
+    """
+    if max_denominator < 1:
+        raise ValueError("max_denominator should be at least 1")
+    p0, q0, p1, q1 = 0, 1, 1, 0
+    while d:
+        a = n // d
+        if q0 + a * q1 > max_denominator:
+            break
+        p0, q0, p1, q1 = p1, q1, p0 + a * p1, q0 + a * q1
+        n, d = d, n - a * d
+    else:
+        return p1, q1
+    k = (max_denominator - q0) // q1
+    p2, q2 = p0 + k * p1, q0 + k * q1
+    # n / d is now the rest of the continued fraction, x is exactly
+    # (p1 n + p0 d) / (q1 n + q0 d): keep p1 / q1 if it is as close as p2 / q2
+    x_numer, x_denom = p1 * n + p0 * d, q1 * n + q0 * d
+    if abs(p1 * x_denom - x_numer * q1) * q2 <= \
+            abs(p2 * x_denom - x_numer * q2) * q1:
+        return p1, q1
+    return p2, q2
+
+
+class RationalAccumulator:
+    """ Sum of Rationals reduced only when its value is read.
+
+    The denominator is kept as the lcm of the denominators added so far:
+    adding a / b only needs gcd(denominator, b), which is cheap when b is
+    small, and no gcd with the numerator. The fraction is reduced when the
+    denominator crosses the size limit and when the value is observed:
+    value(), repr and the comparisons. Ints, rationals and floats, exactly,
+    can be added.
+
+        total = RationalAccumulator()
+        for r in values:
+            total += r
+        total.value()
+
+    sum(values, RationalAccumulator()) works too.
+    """
+
+    __slots__ = ("numer", "denom", "_limit")
+
+    __hash__ = None  # mutable
+
+    def __init__(self, start=0):
+        terms = _accumulator_terms(start)
+        if terms is None:
+            raise TypeError(f"cannot accumulate {type(start).__name__}")
+        self.numer, self.denom = terms
+        self._limit = NORMALIZE_BITS
+
+    def _add(self, a, b):
+        d = self.denom
+        if b == d:
+            self.numer += a
+            return
+        g = gcd(d, b)
+        if g == b:
+            self.numer += a * (d // b)
+            return
+        m = b // g
+        self.numer = self.numer * m + a * (d // g)
+        self.denom = d * m
+        if self.denom.bit_length() > self._limit:
+            self._reduce()
+            self._limit = max(2 * self.denom.bit_length(), NORMALIZE_BITS)
+
+    def _reduce(self):
+        self.numer, self.denom = _normalize(self.numer, self.denom)
+
+    # Rationals and ints are read directly, the other numbers through
+    # _accumulator_terms: floats are added exactly
+
+    def __iadd__(self, other):
+        if type(other) is Rational:
+            self._add(other.numer, other.denom)
+        elif type(other) is int:
+            self.numer += other * self.denom
+        else:
+            terms = _accumulator_terms(other)
+            if terms is None:
+                return NotImplemented
+            self._add(*terms)
+        return self
+
+    def __isub__(self, other):
+        if type(other) is Rational:
+            self._add(-other.numer, other.denom)
+        elif type(other) is int:
+            self.numer -= other * self.denom
+        else:
+            terms = _accumulator_terms(other)
+            if terms is None:
+                return NotImplemented
+            self._add(-terms[0], terms[1])
+        return self
+
+    def __add__(self, other):
+        result = RationalAccumulator(self)
+        result._limit = self._limit
+        return result.__iadd__(other)
+
+    __radd__ = __add__
+
+    def value(self):
+        """ The sum as a reduced Rational """
+        self._reduce()
+        return Rational._reduced(self.numer, self.denom)
+
+    def __repr__(self):
+        return repr(self.value())
+
+    # comparisons observe the value: the sum is reduced, then compared as a
+    # Rational with any number Rational compares with
+
+    def _compare(self, other, op):
+        if isinstance(other, RationalAccumulator):
+            other = other.value()
+        return op(self.value(), other)
+
+    def __eq__(self, other):
+        return self._compare(other, operator.eq)
+
+    def __lt__(self, other):
+        return self._compare(other, operator.lt)
+
+    def __le__(self, other):
+        return self._compare(other, operator.le)
+
+    def __gt__(self, other):
+        return self._compare(other, operator.gt)
+
+    def __ge__(self, other):
+        return self._compare(other, operator.ge)
+
+
+def _accumulator_terms(value):
+    """ (numerator, denominator) of an accumulator, a rational or the exact
+    value of a finite float, else None """
+    if isinstance(value, RationalAccumulator):
+        return value.numer, value.denom
+    if isinstance(value, float):
+        return _exact_terms(value)
+    return _terms(value)
+
+
+def rational_sum(values, start=0):
+    """ Sum of Rationals and ints, reduced once at the end """
+    total = RationalAccumulator(start)
+    for value in values:
+        total += value
+    return total.value()
+
+
 if __name__ == "__main__":
     r1 = Rational(2, 3)
     r2 = Rational(3, 4)
@@ -46,3 +528,6 @@ if __name__ == "__main__":
     print(f"r1+r2 = {r1+r2}")
     print(f"r1*r2 = {r1*r2}")
     print(f"r1/r2 = {r1/r2}")
+    print(f"sum = {rational_sum(Rational(1, n) for n in range(1, 11))}")
+    print(f"pi = {Rational.from_float(math.pi, 1000)}",
+          list(convergents(math.pi))[:4])
@@ -0,0 +1,333 @@
+"""
+Arrays of rational numbers stored as two parallel integer arrays, the
+numerators and the denominators, always reduced with positive denominators.
+
+The arrays are int64 as long as the values fit: before every operation the
+size of the result is bounded from the largest operands, and when it could
+overflow the arrays are converted to object arrays of Python integers,
+which are exact whatever their size. The result goes back to int64 when it
+fits again after the reduction.
+"""
+from math import lcm, prod
+
+import numpy as np
+
+try:
+    from .polynomial import INT64_MAX, _max_abs
+    from .rational import Rational
+except ImportError:  # run as a script: python rational_array.py
+    from polynomial import INT64_MAX, _max_abs
+    from rational import Rational
+
+
+def _integers(values):
+    """ values as an int64 array, or an object array of Python ints """
+    values = np.asarray(values)
+    kind = values.dtype.kind
+    if values.size == 0 or kind in "bi" or \
+            kind == "u" and values.dtype.itemsize < 8:
+        return values.astype(np.int64)
+    if kind == "u":
+        values = values.astype(object)
+    if values.dtype != object:
+        raise TypeError(f"integers expected, not {values.dtype}")
+    if values.size and _max_abs(values) <= INT64_MAX:
+        return values.astype(np.int64)
+    return values
+
+
+def _promote(bound, *arrays):
+    """ arrays as object arrays if one of them is, or if bound overflows """
+    if bound > INT64_MAX or any(a.dtype == object for a in arrays):
+        return [a.astype(object) for a in arrays]
+    return arrays
+
+
+def _reduce(numer, denom):
+    """ Divide by the gcds, make the denominators positive """
+    if np.any(denom == 0):
+        raise ZeroDivisionError("RationalArray with a zero denominator")
+    g = np.gcd(numer, denom)
+    g = np.where(denom < 0, -g, g)
+    numer, denom = numer // g, denom // g
+    if numer.dtype == object and numer.size and \
+            max(_max_abs(numer), _max_abs(denom)) <= INT64_MAX:
+        numer, denom = numer.astype(np.int64), denom.astype(np.int64)
+    return numer, denom
+
+
+def _float_terms(x):
+    """ int64 arrays (n, d) with x = n / d exactly, d a power of 2, and
+    the mask of the values of x whose terms fit in int64 """
+    mantissa, exponent = np.frexp(x)
+    n = (mantissa * 2.0**53).astype(np.int64)
+    shift = 53 - exponent.astype(np.int64)
+    # drop the powers of 2 shared by n and d = 2**shift
+    low = n & -n
+    zeros = np.log2(np.where(low > 0, low, 1)).astype(np.int64)
+    drop = np.clip(np.minimum(zeros, shift), 0, None)
+    n, shift = n >> drop, shift - drop
+    fits = (shift >= 0) & (shift <= 62) | (shift < 0) & (np.abs(x) < 2.0**62)
+    # 0 has no power of 2 to drop: its denominator is set to 1
+    d = np.where((shift >= 0) & fits & (n != 0),
+                 1 << np.clip(shift, 0, 62), 1)
+    n = np.where(shift >= 0, n, np.where(fits, x, 0).astype(np.int64))
+    return n, d, fits
+
+
+def _best_approximations(n, d, max_denominator):
+    """ best_approximation of every n[i] / d[i], on int64 arrays, with one
+    vectorised step of the continued fractions at a time """
+    n, d = n.copy(), d.copy()
+    p0, q0 = np.zeros_like(n), np.ones_like(n)
+    p1, q1 = np.ones_like(n), np.zeros_like(n)
+    done = d <= max_denominator
+    p, q = np.where(done, n, 0), np.where(done, d, 1)
+    active = np.flatnonzero(~done)
+    while len(active):
+        a = n[active] // d[active]
+        # q0 + a q1 > max_denominator, written without overflow
+        q1a = q1[active]
+        stop = (q1a > 0) & (a > (max_denominator - q0[active]) //
+                            np.maximum(q1a, 1))
+
+        i, ai = active[~stop], a[~stop]
+        p0[i], q0[i], p1[i], q1[i] = \
+            p1[i], q1[i], p0[i] + ai * p1[i], q0[i] + ai * q1[i]
+        n[i], d[i] = d[i], n[i] - ai * d[i]
+        exact = i[d[i] == 0]
+        p[exact], q[exact] = p1[exact], q1[exact]
+
+        # the last convergent or the largest semiconvergent k: with r = n / d
+        # the rest of the continued fraction, the convergent is at least as
+        # close iff r >= 2k + q0 / q1, always true when 2k < a and false
+        # when 2k > a; when 2k = a it is (n - a d) q1 >= q0 d
+        j, aj = active[stop], a[stop]
+        k = (max_denominator - q0[j]) // q1[j]
+        semi = 2 * k > aj
+        tie = 2 * k == aj
+        if tie.any():
+            t = j[tie]
+            rest = (n[t] - aj[tie] * d[t]).astype(object)
+            semi[tie] = rest * q1[t].astype(object) < \
+                q0[t].astype(object) * d[t].astype(object)
+        p[j] = np.where(semi, p0[j] + k * p1[j], p1[j])
+        q[j] = np.where(semi, q0[j] + k * q1[j], q1[j])
+        active = i[d[i] != 0]
+    return p, q
+
+
+class RationalArray:
+    """ Array of rational numbers """
+
+    __slots__ = ("numer", "denom")
+
+    # numpy arrays must not broadcast over a RationalArray operand
+    __array_ufunc__ = None
+
+    def __init__(self, numer, denom=1):
+        numer, denom = np.broadcast_arrays(_integers(numer), _integers(denom))
+        numer, denom = _promote(0, numer, denom)
+        self.numer, self.denom = _reduce(numer, denom)
+
+    @classmethod
+    def _reduced(cls, numer, denom):
+        self = object.__new__(cls)
+        self.numer, self.denom = numer, denom
+        return self
+
+    @classmethod
+    def from_float(cls, values, max_denominator=None):
+        """ Rational values of a float array, exact or the closest ones
+        with denominators at most max_denominator (Rational.from_float) """
+        x = np.asarray(values, dtype=float)
+        if not np.all(np.isfinite(x)):
+            raise ValueError("cannot convert inf or nan to a Rational")
+        if max_denominator is None:
+            terms = [v.as_integer_ratio() for v in x.ravel().tolist()]
+            return cls(np.reshape([n for n, d in terms], x.shape),
+                       np.reshape([d for n, d in terms], x.shape))
+        if max_denominator < 1:
+            raise ValueError("max_denominator should be at least 1")
+        n, d, fits = _float_terms(x)
+        # the numerators p <= |x| q + 1 must fit too
+        fits &= np.abs(x) < 2.0**62 / (max_denominator + 1)
+        p, q = _best_approximations(n[fits], d[fits], max_denominator)
+        if fits.all():
+            return cls._reduced(p.reshape(x.shape), q.reshape(x.shape))
+        numer, denom = np.empty(x.shape, dtype=object), \
+            np.empty(x.shape, dtype=object)
+        numer[fits], denom[fits] = p, q
+        for i in zip(*np.nonzero(~fits)):
+            r = Rational.from_float(float(x[i]), max_denominator)
+            numer[i], denom[i] = r.numer, r.denom
+        return cls(numer, denom)
+
+    @classmethod
+    def from_rationals(cls, values):
+        values = list(values)
+        return cls([r.numer for r in values], [r.denom for r in values])
+
+    def to_rationals(self):
+        """ List of the Rational values, in flattened order """
+        return [Rational._reduced(n, d) for n, d in
+                zip(self.numer.ravel().tolist(), self.denom.ravel().tolist())]
+
+    def to_float(self):
+        return self.numer / self.denom
+
+    @property
+    def shape(self):
+        return self.numer.shape
+
+    def __len__(self):
+        return len(self.numer)
+
+    def __getitem__(self, index):
+        numer, denom = self.numer[index], self.denom[index]
+        if np.ndim(numer) == 0:
+            return Rational._reduced(int(numer), int(denom))
+        return RationalArray._reduced(numer, denom)
+
+    def __repr__(self):
+        return f"RationalArray({self.to_rationals()!r})"
+
+    def _coerce(self, other):
+        if isinstance(other, RationalArray):
+            return other
+        if isinstance(other, Rational):
+            return RationalArray._reduced(_integers(other.numer),
+                                          _integers(other.denom))
+        if isinstance(other, (int, np.integer)) or \
+                isinstance(other, np.ndarray) and other.dtype.kind in "biu":
+            numer = _integers(other)
+            return RationalArray._reduced(numer, np.ones_like(numer))
+        return None
+
+    # + - * / as for Rational: the operands are reduced, so only the
+    # gcd of the denominators is shared by the cross products
+
+    def _add(self, c, d):
+        a, b = self.numer, self.denom
+        a, b, c, d = _promote(max(_max_abs(a) * _max_abs(d) +
+                                  _max_abs(c) * _max_abs(b),
+                                  _max_abs(b) * _max_abs(d)), a, b, c, d)
+        g = np.gcd(b, d)
+        s = b // g
+        return RationalArray._reduced(*_reduce(a * (d // g) + c * s, s * d))
+
+    def __add__(self, other):
+        other = self._coerce(other)
+        if other is None:
+            return NotImplemented
+        return self._add(other.numer, other.denom)
+
+    __radd__ = __add__
+
+    def __neg__(self):
+        numer = self.numer
+        if numer.dtype == np.int64 and _max_abs(numer) > INT64_MAX:
+            numer = numer.astype(object)
+        return RationalArray._reduced(-numer, self.denom)
+
+    def __sub__(self, other):
+        other = self._coerce(other)
+        if other is None:
+            return NotImplemented
+        return self._add(-other.numer, other.denom)
+
+    def __rsub__(self, other):
+        return (-self) + other
+
+    def _mul(self, c, d):
+        a, b = self.numer, self.denom
+        a, b, c, d = _promote(max(_max_abs(a) * _max_abs(c),
+                                  _max_abs(b) * _max_abs(d)), a, b, c, d)
+        return RationalArray._reduced(*_reduce(a * c, b * d))
+
+    def __mul__(self, other):
+        other = self._coerce(other)
+        if other is None:
+            return NotImplemented
+        return self._mul(other.numer, other.denom)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        other = self._coerce(other)
+        if other is None:
+            return NotImplemented
+        if np.any(other.numer == 0):
+            raise ZeroDivisionError("division by a zero Rational")
+        return self._mul(other.denom, other.numer)
+
+    def __rtruediv__(self, other):
+        other = self._coerce(other)
+        if other is None:
+            return NotImplemented
+        return other / self
+
+    # comparisons of a / b and c / d, with b, d > 0: a * d and c * b
+
+    def _cross(self, other):
+        other = self._coerce(other)
+        if other is None:
+            return None, None
+        a, b, c, d = self.numer, self.denom, other.numer, other.denom
+        a, b, c, d = _promote(max(_max_abs(a) * _max_abs(d),
+                                  _max_abs(c) * _max_abs(b)), a, b, c, d)
+        return a * d, c * b
+
+    def __eq__(self, other):
+        other = self._coerce(other)
+        if other is None:
+            return NotImplemented
+        # reduced fractions are equal when their terms are equal
+        return (self.numer == other.numer) & (self.denom == other.denom)
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else ~equal
+
+    def __lt__(self, other):
+        left, right = self._cross(other)
+        return NotImplemented if left is None else np.asarray(left < right)
+
+    def __le__(self, other):
+        left, right = self._cross(other)
+        return NotImplemented if left is None else np.asarray(left <= right)
+
+    def __gt__(self, other):
+        left, right = self._cross(other)
+        return NotImplemented if left is None else np.asarray(left > right)
+
+    def __ge__(self, other):
+        left, right = self._cross(other)
+        return NotImplemented if left is None else np.asarray(left >= right)
+
+    def sum(self):
+        """ Sum as a Rational. The numerators of equal denominators are
+        added first, then the partial sums are brought to the lcm of the
+        distinct denominators and a single fraction is reduced """
+        denominators, groups = np.unique(self.denom, return_inverse=True)
+        numer, = _promote(_max_abs(self.numer) * self.numer.size, self.numer)
+        sums = np.zeros(len(denominators), dtype=numer.dtype)
+        np.add.at(sums, groups.ravel(), numer.ravel())
+        denominators = denominators.tolist()
+        common = lcm(*denominators) if denominators else 1
+        return Rational(sum(n * (common // d) for n, d in
+                            zip(sums.tolist(), denominators)), common)
+
+    def prod(self):
+        """ Product as a Rational, reduced once """
+        return Rational(prod(self.numer.tolist()), prod(self.denom.tolist()))
+
+
+if __name__ == "__main__":
+    x = RationalArray([1, 2, 3], [2, 3, 4])
+    y = RationalArray.from_rationals([Rational(1, 3), Rational(-1, 2),
+                                      Rational(5, 4)])
+    print(x + y, x - y, x * y, x / y, sep="\n")
+    print(x < y, x.sum(), x.prod())
+    print(x * RationalArray([2**62, 1, 1]))
+    print(RationalArray.from_float([np.pi, 0.1, -1.75], max_denominator=1000))
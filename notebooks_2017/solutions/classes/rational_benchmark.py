@@ -0,0 +1,76 @@
+"""
+Throughput of Rational arithmetic, compared with fractions.Fraction.
+
+    python rational_benchmark.py
+    python -m solutions.classes.rational_benchmark
+    python -m solutions.classes.rational_benchmark --size 10000 --bits 64
+
+Every operation is applied to the pairs of two lists of random fractions
+with --bits bit numerators and denominators; "sum" and "product"
+reduce a whole list. Times are the best of --repeat runs, in
+nanoseconds per operation.
+"""
+import argparse
+import operator
+import random
+import time
+from fractions import Fraction
+from functools import reduce
+
+try:
+    from .rational import Rational
+except ImportError:  # run as a script: python rational_benchmark.py
+    from rational import Rational
+
+# operation(cls, xs, ys, pairs): xs and ys are lists of cls instances, pairs
+# the (numerator, denominator) integers of xs
+OPERATIONS = {
+    "new": lambda cls, xs, ys, pairs: [cls(n, d) for n, d in pairs],
+    "add": lambda cls, xs, ys, pairs: list(map(operator.add, xs, ys)),
+    "sub": lambda cls, xs, ys, pairs: list(map(operator.sub, xs, ys)),
+    "mul": lambda cls, xs, ys, pairs: list(map(operator.mul, xs, ys)),
+    "div": lambda cls, xs, ys, pairs: list(map(operator.truediv, xs, ys)),
+    "sum": lambda cls, xs, ys, pairs: reduce(operator.add, xs),
+    "product": lambda cls, xs, ys, pairs: reduce(operator.mul, xs),
+}
+
+
+def random_pairs(n, bits):
+    return [(random.getrandbits(bits) - (1 << bits - 1),
+             random.getrandbits(bits) + 1) for _ in range(n)]
+
+
+def timeit(operation, cls, xs, ys, repeat=3):
+    """ Return the best wall time of operation on the pairs xs, ys """
+    x_values, y_values = [cls(n, d) for n, d in xs], [cls(n, d) for n, d in ys]
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        operation(cls, x_values, y_values, xs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark(size=10000, bits=32, operations=tuple(OPERATIONS), repeat=3):
+    xs, ys = random_pairs(size, bits), random_pairs(size, bits)
+    print(f"{'operation':>10} {'Rational':>12} {'Fraction':>12}")
+    for name in operations:
+        times = [timeit(OPERATIONS[name], cls, xs, ys, repeat) / size * 1e9
+                 for cls in (Rational, Fraction)]
+        print(f"{name:>10} {times[0]:>10.0f}ns {times[1]:>10.0f}ns")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=10000)
+    parser.add_argument("--bits", type=int, default=32,
+                        help="size of the random numerators and denominators")
+    parser.add_argument("--operations", nargs="+", choices=list(OPERATIONS),
+                        default=list(OPERATIONS))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+    benchmark(args.size, args.bits, args.operations, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
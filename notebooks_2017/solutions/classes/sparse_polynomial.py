@@ -0,0 +1,163 @@
+"""
+Sparse polynomials: only the non zero terms are stored, in a dictionary
+{exponent: coefficient}. x^1000000 + 1 costs two entries instead of a
+million coefficients, and every operation runs in time proportional to
+the number of terms.
+
+`best_form` returns the dense Polynomial or the SparsePolynomial form of a
+polynomial depending on its fill ratio; the operations mixing both forms
+return their result in its best form.
+"""
+from math import perm
+
+import numpy as np
+
+try:
+    from .polynomial import (Polynomial, as_coefficients, format_terms,
+                             parse_terms)
+except ImportError:  # run as a script: python sparse_polynomial.py
+    from polynomial import (Polynomial, as_coefficients, format_terms,
+                            parse_terms)
+
+# fraction of non zero coefficients above which the dense form is preferred
+DENSE_FILL = 0.25
+
+
+class SparsePolynomial:
+    """ Polynomial stored as {exponent: coefficient} """
+
+    __slots__ = ("terms",)
+
+    def __init__(self, terms):
+        if isinstance(terms, dict):
+            terms = terms.items()
+        self.terms = {int(e): c for e, c in terms if c != 0}
+
+    @classmethod
+    def from_dense(cls, p):
+        coeffs = p.coeffs
+        return cls(zip(np.flatnonzero(coeffs).tolist(),
+                       coeffs[coeffs != 0].tolist()))
+
+    def to_dense(self):
+        coeffs = [0] * self.degree
+        for e, c in self.terms.items():
+            coeffs[e] = c
+        return Polynomial(coeffs)
+
+    @property
+    def degree(self):
+        """ Number of dense coefficients, as Polynomial.degree """
+        return max(self.terms, default=-1) + 1
+
+    def __len__(self):
+        return len(self.terms)
+
+    def diff(self, n):
+        """ Return the nth derivative """
+        return SparsePolynomial((e - n, c * perm(e, n))
+                                for e, c in self.terms.items() if e >= n)
+
+    def __call__(self, x):
+        """ Evaluate term by term, with the types of Polynomial.__call__:
+        integer coefficients and points give exact integers """
+        if isinstance(x, (list, tuple)):
+            return self(np.asarray(x)).tolist()
+        if not isinstance(x, np.ndarray):
+            result = 0
+            for e, c in self.terms.items():
+                result = result + c * x ** e
+            return result
+
+        coeffs = as_coefficients(list(self.terms.values()))
+        dtype = np.result_type(coeffs, x)
+        if dtype == np.int64 and x.size and len(coeffs):
+            # the value is bounded by sum |c| * max|x|^e, compared in bits
+            m = max(int(x.max()), -int(x.min()), 1)
+            bits = sum(abs(c) for c in coeffs.tolist()).bit_length()
+            if m > 1:
+                bits += (m - 1).bit_length() * max(self.terms)
+            if bits > 63:
+                dtype = object
+        x = x.astype(dtype)
+        result = np.zeros(x.shape, dtype=dtype)
+        for e, c in zip(self.terms, coeffs.tolist()):
+            result += c * x ** e
+        return result
+
+    def __repr__(self):
+        return self.to_string()
+
+    def to_string(self, max_terms=None):
+        """ Text of the terms, at most max_terms of them """
+        return format_terms(sorted(self.terms.items()), max_terms)
+
+    @classmethod
+    def from_string(cls, text):
+        return cls(parse_terms(text))
+
+    def __eq__(self, other):
+        if isinstance(other, Polynomial):
+            other = SparsePolynomial.from_dense(other)
+        if not isinstance(other, SparsePolynomial):
+            return NotImplemented
+        return self.terms == other.terms
+
+    def __neg__(self):
+        return SparsePolynomial((e, -c) for e, c in self.terms.items())
+
+    def __add__(self, other):
+        if isinstance(other, Polynomial):
+            other = SparsePolynomial.from_dense(other)
+        elif not isinstance(other, SparsePolynomial):
+            return NotImplemented
+        terms = dict(self.terms)
+        for e, c in other.terms.items():
+            terms[e] = terms.get(e, 0) + c
+        return best_form(SparsePolynomial(terms))
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if not isinstance(other, (Polynomial, SparsePolynomial)):
+            return NotImplemented
+        return self + (-other)
+
+    def __rsub__(self, other):
+        return (-self) + other
+
+    def __mul__(self, other):
+        if isinstance(other, Polynomial):
+            other = SparsePolynomial.from_dense(other)
+        if isinstance(other, SparsePolynomial):
+            terms = {}
+            for e1, c1 in self.terms.items():
+                for e2, c2 in other.terms.items():
+                    terms[e1 + e2] = terms.get(e1 + e2, 0) + c1 * c2
+            return best_form(SparsePolynomial(terms))
+        return SparsePolynomial((e, c * other) for e, c in self.terms.items())
+
+    __rmul__ = __mul__
+
+
+def best_form(p):
+    """ Return p as a Polynomial if it is dense enough, else as a
+    SparsePolynomial """
+    if isinstance(p, Polynomial):
+        nonzero = np.count_nonzero(p.coeffs)
+        if p.degree and nonzero < DENSE_FILL * p.degree:
+            return SparsePolynomial.from_dense(p)
+        return p
+    if len(p.terms) >= DENSE_FILL * p.degree:
+        return p.to_dense()
+    return p
+
+
+if __name__ == "__main__":
+    P = SparsePolynomial({1000000: 1, 0: 1})
+    Q = Polynomial([1, 2, 3])
+    print(P)
+    print(P.diff(2))
+    print(P * P)
+    print(P + Q, type(P + Q).__name__)
+    print(best_form(SparsePolynomial({0: 1, 1: 2})), P(1.0))
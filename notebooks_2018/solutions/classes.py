@@ -150,7 +150,11 @@ class Polynomial:
         return "+".join([str(c)+"x^"+str(e) for e,c in enumerate(self.coeffs)])
     
     def __call__(self, x):
-        return sum([ c*x**(e) for e,c in enumerate(self.coeffs)])
+        " Horner scheme: c_0 + x*(c_1 + x*(c_2 + ...)) "
+        result = 0
+        for c in reversed(self.coeffs):
+            result = result * x + c
+        return result
 
 p = Polynomial([1, -2, 3, 7, 11, 6, 4])
 p.degree(), p.coeffs
@@ -412,7 +416,11 @@ class Polynomial:
       self.coeffs = coeffs
         
    def __call__(self, x):
-      return sum([coef*x**exp for exp,coef in enumerate(self.coeffs)])
+      " Horner scheme, x can be a number or a numpy array "
+      result = 0
+      for coef in reversed(self.coeffs):
+         result = result * x + coef
+      return result
 
 p = Polynomial([2,4,-1])
 p(2) 
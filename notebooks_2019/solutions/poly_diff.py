@@ -1,3 +1,5 @@
+from math import factorial
+
 # with recursion
 def diff(P, n):
     for d in range(n):
@@ -16,6 +18,19 @@ def diff(p, n):
     else:
         return diff([i * p[i] for i in range(1, len(p))], n - 1)
 
+# in one pass: p[k] is multiplied by k (k-1) ... (k-n+1), and each of these
+# factors is deduced from the previous one
+def diff(p, n):
+    """ Return the nth derivative of polynom P """
+    if n >= len(p):
+        return []
+    factor = factorial(n)
+    result = []
+    for k in range(n, len(p)):
+        result.append(factor * p[k])
+        factor = factor * (k + 1) // (k + 1 - n)
+    return result
+
 
 print(diff([3, 2, 1, 5, 7], 2))
 print(diff([-6, 5, -3, -4, 3, -4], 3))
@@ -0,0 +1,200 @@
+"""
+Multi-core merge sort built on sorting_algorithms.py.
+
+The input is cut into one chunk per worker, every chunk is sorted in a
+ProcessPoolExecutor worker and the sorted runs are merged.
+
+- numeric inputs are sample sorted through two multiprocessing.shared_memory
+  blocks: the workers sort their slice of the first block in place, the
+  sorted slices are cut at common splitters into one key range per worker,
+  and every worker merges its key range into its place in the second block.
+  Nothing is pickled but the block names and the bounds;
+- other inputs (strings, tuples...) are pickled chunk by chunk and merged
+  with a heap (heapq.merge).
+
+Below PARALLEL_MIN_SIZE items (PARALLEL_NUMERIC_MIN_SIZE for numeric
+inputs, which hybrid_sort hands to numpy), starting processes costs more
+than it saves and hybrid_sort is called directly.
+"""
+import array
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from sorting_algorithms import (hybrid_sort, np, _numeric_array,
+                                _sort_with_key, _stable_sort)
+
+PARALLEL_MIN_SIZE = 1_000_000
+# numpy sorts 10**7 float64 in about 0.45 s on one core: below that, the
+# pool start-up and the copies to and from shared memory are not recovered.
+# Run this module to measure the crossover on a given machine.
+PARALLEL_NUMERIC_MIN_SIZE = 10_000_000
+
+
+def _chunk_bounds(n, chunks):
+    step = max(1, -(-n // chunks))
+    return [(lo, min(lo + step, n)) for lo in range(0, n, step)]
+
+
+def _sort_shared_chunk(name, dtype, n, lo, hi):
+    """ Worker: sort a slice of the shared memory block in place """
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        values = np.ndarray((n,), dtype=dtype, buffer=shm.buf)
+        _stable_sort(values[lo:hi])
+        del values
+    finally:
+        shm.close()
+
+
+def _merge_shared_range(source, target, dtype, n, pieces, start):
+    """ Worker: merge the sorted pieces [(lo, hi)] of the source block into
+    the target block from start """
+    shm_source = shared_memory.SharedMemory(name=source)
+    shm_target = shared_memory.SharedMemory(name=target)
+    try:
+        values = np.ndarray((n,), dtype=dtype, buffer=shm_source.buf)
+        merged = np.ndarray((n,), dtype=dtype, buffer=shm_target.buf)
+        out = merged[start:start + sum(hi - lo for lo, hi in pieces)]
+        np.concatenate([values[lo:hi] for lo, hi in pieces], out=out)
+        # the pieces are sorted runs: the stable sort, a timsort, finds them
+        # and merges them (faster here than the default sort, and stable)
+        out.sort(kind="stable")
+        del values, merged, out
+    finally:
+        shm_source.close()
+        shm_target.close()
+
+
+def _splitters(values, bounds, count):
+    """ count - 1 values cutting the sorted runs in ranges of similar size """
+    samples = np.concatenate([values[lo:hi][np.linspace(0, hi - lo - 1,
+                                                        4 * count,
+                                                        dtype=np.int64)]
+                              for lo, hi in bounds if hi > lo])
+    samples.sort()
+    return samples[len(samples) * np.arange(1, count) // count]
+
+
+def _sort_chunk(chunk):
+    """ Worker: sort a pickled chunk """
+    return hybrid_sort(chunk)
+
+
+def _parallel_numeric_sort(values, workers):
+    n = len(values)
+    if n == 0:
+        return values.copy()
+    size = max(values.nbytes, 1)
+    shm_source = shared_memory.SharedMemory(create=True, size=size)
+    shm_target = shared_memory.SharedMemory(create=True, size=size)
+    try:
+        shared = np.ndarray(values.shape, dtype=values.dtype,
+                            buffer=shm_source.buf)
+        shared[:] = values
+        bounds = _chunk_bounds(n, workers)
+        dtype = values.dtype.str
+        with ProcessPoolExecutor(workers) as pool:
+            futures = [pool.submit(_sort_shared_chunk, shm_source.name,
+                                   dtype, n, lo, hi) for lo, hi in bounds]
+            for future in futures:
+                future.result()
+
+            # cuts[i][j]: start of the key range j in the run i
+            splitters = _splitters(shared, bounds, workers)
+            cuts = [[lo] + (lo + np.searchsorted(shared[lo:hi], splitters,
+                                                 side="left")).tolist() + [hi]
+                    for lo, hi in bounds]
+            futures, start = [], 0
+            for j in range(workers):
+                pieces = [(run[j], run[j + 1]) for run in cuts]
+                futures.append(pool.submit(_merge_shared_range,
+                                           shm_source.name, shm_target.name,
+                                           dtype, n, pieces, start))
+                start += sum(hi - lo for lo, hi in pieces)
+            for future in futures:
+                future.result()
+        result = np.ndarray(values.shape, dtype=values.dtype,
+                            buffer=shm_target.buf).copy()
+        del shared
+    finally:
+        for shm in (shm_source, shm_target):
+            shm.close()
+            shm.unlink()
+    return result
+
+
+def _numeric_values(arr):
+    """ Return arr as a 1-D numeric numpy array, or None """
+    if np is None:
+        return None
+    if isinstance(arr, np.ndarray):
+        return arr if arr.ndim == 1 and arr.dtype.kind in "iuf" else None
+    if isinstance(arr, array.array):
+        if arr.typecode not in "bBhHiIlLqQfd":
+            return None
+        return np.frombuffer(arr, dtype=arr.typecode)
+    return _numeric_array(arr)
+
+
+def parallel_sort(arr, workers=None, min_size=PARALLEL_MIN_SIZE, key=None,
+                  reverse=False):
+    """ Sort arr in place using several processes and return it """
+    n = len(arr)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if n < min_size or workers < 2:
+        return hybrid_sort(arr, key=key, reverse=reverse)
+
+    if key is not None or reverse:
+        # keys are computed once here, the workers sort (key, index) pairs
+        def sort(decorated):
+            return parallel_sort(decorated, workers, min_size)
+        return _sort_with_key(sort, arr, 0, None, key, reverse)
+
+    values = _numeric_values(arr)
+    if values is not None:
+        if n < max(min_size, PARALLEL_NUMERIC_MIN_SIZE):
+            return hybrid_sort(arr)
+        result = _parallel_numeric_sort(values, workers)
+        if isinstance(arr, list):
+            arr[:] = result.tolist()
+        else:
+            # numpy arrays, and array.array through its buffer view
+            values[:] = result
+        return arr
+
+    bounds = _chunk_bounds(n, workers)
+    with ProcessPoolExecutor(workers) as pool:
+        runs = list(pool.map(_sort_chunk, [arr[lo:hi] for lo, hi in bounds]))
+    arr[:] = heapq.merge(*runs)
+    return arr
+
+
+if __name__ == "__main__":
+
+    import time
+
+    for n in [10**6, 10**7]:
+        data = np.random.random(n)
+        arr = data.copy()
+        start = time.perf_counter()
+        hybrid_sort(arr)
+        print(f"n = {n:9d} hybrid_sort        "
+              f"time = {time.perf_counter() - start:.3f}s")
+        for workers in range(2, max(os.cpu_count() or 1, 2) + 1):
+            arr = data.copy()
+            start = time.perf_counter()
+            _parallel_numeric_sort(arr, workers)
+            elapsed = time.perf_counter() - start
+            print(f"n = {n:9d} workers = {workers:2d} time = {elapsed:.3f}s")
+        data = data.tolist()
+        for workers in range(2, max(os.cpu_count() or 1, 2) + 1):
+            arr = data[:]
+            start = time.perf_counter()
+            parallel_sort(arr, workers=workers, min_size=0)
+            elapsed = time.perf_counter() - start
+            assert arr == sorted(data)
+            print(f"n = {n:9d} workers = {workers:2d} time = {elapsed:.3f}s"
+                  " (list)")
@@ -0,0 +1,245 @@
+"""
+A sorted list that stays sorted: no need to call insertion_sort again after
+adding a few items.
+
+The items are stored in a list of sorted blocks of about LOAD items, with
+the maximum of every block in a separate list. Finding the block of a value
+is a bisection over the maxima, inserting in a block shifts at most 2 * LOAD
+pointers, and a Fenwick tree over the block lengths turns a block position
+into a global rank in O(log n).
+"""
+from bisect import bisect_left, bisect_right, insort
+from itertools import chain, islice
+
+from sorting_algorithms import hybrid_sort
+
+LOAD = 1000
+
+
+class SortedList:
+    """ Sorted collection with O(log n) add, remove and rank queries """
+
+    def __init__(self, iterable=()):
+        items = list(iterable)
+        hybrid_sort(items)
+        self._load(items)
+
+    @classmethod
+    def from_sorted(cls, items):
+        """ Build from items already in ascending order, without sorting """
+        self = cls.__new__(cls)
+        self._load(list(items))
+        return self
+
+    def _load(self, items):
+        self._lists = [items[i:i + LOAD] for i in range(0, len(items), LOAD)]
+        self._maxes = [block[-1] for block in self._lists]
+        self._len = len(items)
+        self._build_index()
+
+    # Fenwick tree of the block lengths
+
+    def _build_index(self):
+        tree = [0] + [len(block) for block in self._lists]
+        for i in range(1, len(tree)):
+            j = i + (i & -i)
+            if j < len(tree):
+                tree[j] += tree[i]
+        self._tree = tree
+
+    def _update_index(self, pos, delta):
+        i = pos + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _loc(self, pos, idx):
+        """ Global rank of item idx of block pos """
+        i = pos
+        while i > 0:
+            idx += self._tree[i]
+            i -= i & -i
+        return idx
+
+    def _pos(self, index):
+        """ (block, offset) of the item at global rank index """
+        pos, step = 0, 1 << (len(self._tree).bit_length() - 1)
+        while step:
+            nxt = pos + step
+            if nxt < len(self._tree) and self._tree[nxt] <= index:
+                pos = nxt
+                index -= self._tree[nxt]
+            step >>= 1
+        return pos, index
+
+    def add(self, value):
+        """ Insert value, after the items equal to it """
+        if not self._maxes:
+            self._load([value])
+            return
+        pos = bisect_right(self._maxes, value)
+        if pos == len(self._maxes):
+            pos -= 1
+            self._lists[pos].append(value)
+            self._maxes[pos] = value
+        else:
+            insort(self._lists[pos], value)
+        self._len += 1
+        block = self._lists[pos]
+        if len(block) > 2 * LOAD:
+            self._lists[pos:pos + 1] = [block[:LOAD], block[LOAD:]]
+            self._maxes[pos:pos + 1] = [block[LOAD - 1], block[-1]]
+            self._build_index()
+        else:
+            self._update_index(pos, 1)
+
+    def update(self, iterable):
+        """ Add all the items of iterable """
+        items = list(iterable)
+        if len(items) > self._len:
+            # cheaper to merge everything and reload
+            items.extend(self)
+            hybrid_sort(items)
+            self._load(items)
+        else:
+            for value in items:
+                self.add(value)
+
+    def remove(self, value):
+        """ Remove one occurrence of value, raise ValueError if absent """
+        pos = bisect_left(self._maxes, value)
+        if pos < len(self._maxes):
+            block = self._lists[pos]
+            idx = bisect_left(block, value)
+            if block[idx] == value:
+                self._delete(pos, idx)
+                return
+        raise ValueError(f"{value!r} not in list")
+
+    def discard(self, value):
+        """ Remove one occurrence of value if present """
+        try:
+            self.remove(value)
+        except ValueError:
+            pass
+
+    def _delete(self, pos, idx):
+        block = self._lists[pos]
+        del block[idx]
+        self._len -= 1
+        if not block:
+            del self._lists[pos]
+            del self._maxes[pos]
+            self._build_index()
+        elif len(block) < LOAD // 2 and len(self._lists) > 1:
+            # join the small block with a neighbour, split again if too big
+            if pos == 0:
+                pos = 1
+            joined = self._lists[pos - 1] + self._lists[pos]
+            if len(joined) > 2 * LOAD:
+                half = len(joined) // 2
+                self._lists[pos - 1:pos + 1] = [joined[:half], joined[half:]]
+                self._maxes[pos - 1:pos + 1] = [joined[half - 1], joined[-1]]
+            else:
+                self._lists[pos - 1:pos + 1] = [joined]
+                self._maxes[pos - 1:pos + 1] = [joined[-1]]
+            self._build_index()
+        else:
+            self._maxes[pos] = block[-1]
+            self._update_index(pos, -1)
+
+    def pop(self, index=-1):
+        """ Remove and return the item at rank index """
+        value = self[index]
+        if index < 0:
+            index += self._len
+        self._delete(*self._pos(index))
+        return value
+
+    def bisect_left(self, value):
+        """ Number of items < value """
+        pos = bisect_left(self._maxes, value)
+        if pos == len(self._maxes):
+            return self._len
+        return self._loc(pos, bisect_left(self._lists[pos], value))
+
+    def bisect_right(self, value):
+        """ Number of items <= value """
+        pos = bisect_right(self._maxes, value)
+        if pos == len(self._maxes):
+            return self._len
+        return self._loc(pos, bisect_right(self._lists[pos], value))
+
+    rank = bisect_left
+
+    def count(self, value):
+        return self.bisect_right(value) - self.bisect_left(value)
+
+    def index(self, value):
+        """ Rank of the first occurrence of value """
+        i = self.bisect_left(value)
+        if i == self._len or self[i] != value:
+            raise ValueError(f"{value!r} not in list")
+        return i
+
+    def irange(self, minimum=None, maximum=None, inclusive=(True, True)):
+        """ Iterate over the items between minimum and maximum """
+        if minimum is None:
+            start = 0
+        elif inclusive[0]:
+            start = self.bisect_left(minimum)
+        else:
+            start = self.bisect_right(minimum)
+        if maximum is None:
+            stop = self._len
+        elif inclusive[1]:
+            stop = self.bisect_right(maximum)
+        else:
+            stop = self.bisect_left(maximum)
+        return self.islice(start, stop)
+
+    def islice(self, start=0, stop=None):
+        """ Iterate over the items of rank start to stop - 1 """
+        if stop is None or stop > self._len:
+            stop = self._len
+        if start >= stop:
+            return iter(())
+        pos, idx = self._pos(start)
+        blocks = chain([self._lists[pos][idx:]], self._lists[pos + 1:])
+        return islice(chain.from_iterable(blocks), stop - start)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("SortedList index out of range")
+        pos, idx = self._pos(index)
+        return self._lists[pos][idx]
+
+    def __contains__(self, value):
+        pos = bisect_left(self._maxes, value)
+        if pos == len(self._maxes):
+            return False
+        block = self._lists[pos]
+        return block[bisect_left(block, value)] == value
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        return chain.from_iterable(self._lists)
+
+    def __reversed__(self):
+        return chain.from_iterable(map(reversed, reversed(self._lists)))
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({list(self)!r})"
+
+
+if __name__ == "__main__":
+
+    s = SortedList([64, 34, 25, 12, 22, 11, 90])
+    print(s)
+    s.add(30)
+    s.remove(64)
+    print(s, s.rank(30), list(s.irange(20, 40)))
@@ -1,7 +1,136 @@
 # ref https://www.clcoding.com/2024/04/sorting-algorithms-using-python.html
+import array
+import bisect
+import heapq
+
+try:
+    import numpy as np
+except ImportError:  # the pure Python sorts still work without numpy
+    np = None
+
+# Homogeneous numeric inputs (lists of int or float, array.array, numpy
+# arrays) longer than VECTORIZE_MIN_SIZE are sorted by numpy instead of the
+# Python loops below. Set VECTORIZE to False to time the algorithms themselves.
+VECTORIZE = True
+VECTORIZE_MIN_SIZE = 256
+
+
+def _vectorized_sort(arr, lo=0, hi=None):
+    """ Sort arr[lo:hi] in place with numpy when arr is numeric.
+
+    Return False, leaving arr untouched, when the input is not eligible.
+    """
+    if np is None or not VECTORIZE:
+        return False
+    if hi is None:
+        hi = len(arr)
+    if hi - lo < VECTORIZE_MIN_SIZE:
+        return False
+    if isinstance(arr, np.ndarray):
+        if arr.ndim != 1 or arr.dtype.kind not in "iuf":
+            return False
+        _stable_sort(arr[lo:hi])
+        return True
+    if isinstance(arr, array.array):
+        if arr.typecode not in "bBhHiIlLqQfd":
+            return False
+        # a view on the array buffer, sorted without any copy
+        _stable_sort(np.frombuffer(arr, dtype=arr.typecode)[lo:hi])
+        return True
+    if isinstance(arr, list):
+        values = _numeric_array(arr[lo:hi])
+        if values is None:
+            return False
+        _stable_sort(values)
+        arr[lo:hi] = values.tolist()
+        return True
+    return False
+
+
+def _stable_sort(values):
+    """ Sort a numeric numpy array in place, keeping equal items in order.
+
+    Equal numbers cannot be told apart, except 0.0 and -0.0: numpy's
+    default sort is used (kind="stable" is several times slower for floats)
+    and the signs of the zeros are put back in their original order.
+    """
+    if values.dtype.kind != "f":
+        values.sort()
+        return
+    signs = np.signbit(values[values == 0])
+    values.sort()
+    if len(signs):
+        # the zeros are contiguous once sorted
+        start = np.searchsorted(values, 0.0)
+        values[start:start + len(signs)] = np.where(signs, -0.0, 0.0)
+
+
+def _numeric_array(seq):
+    """ numpy array of a list of only ints or only floats, else None """
+    types = set(map(type, seq))
+    if types == {int}:
+        dtype = np.int64
+    elif types == {float}:
+        dtype = np.float64
+    else:
+        return None
+    try:
+        return np.array(seq, dtype=dtype)
+    except OverflowError:  # integers larger than 64 bits
+        return None
+
+
+def _sort_with_key(sort, arr, lo, hi, key, reverse):
+    """ Sort arr[lo:hi] in place with `sort`, computing key(x) once per item.
+
+    Items are decorated as (key, index) pairs so the items themselves are
+    never compared and equal keys keep their original order: every
+    algorithm becomes stable. With reverse=True the index is negated and the
+    result read backwards, which keeps equal keys in their original order
+    as sorted() does.
+    """
+    if hi is None:
+        hi = len(arr)
+    items = arr[lo:hi] if isinstance(arr, list) else list(arr[lo:hi])
+    keys = items if key is None else list(map(key, items))
+    n = len(items)
+
+    order = None
+    if np is not None and VECTORIZE and n >= VECTORIZE_MIN_SIZE:
+        values = _numeric_array(keys)
+        if values is not None:
+            if reverse:
+                order = (n - 1 - np.argsort(values[::-1], kind="stable"))[::-1]
+            else:
+                order = np.argsort(values, kind="stable")
+            order = order.tolist()
+    if order is None:
+        if reverse:
+            decorated = list(zip(keys, range(0, -n, -1)))
+        else:
+            decorated = list(zip(keys, range(n)))
+        sort(decorated)
+        order = [abs(i) for _, i in decorated]
+        if reverse:
+            order.reverse()
+
+    if isinstance(arr, list):
+        arr[lo:hi] = [items[i] for i in order]
+    else:
+        for k, i in enumerate(order, lo):
+            arr[k] = items[i]
+    return arr
+
+
+def selection_sort(arr, key=None, reverse=False):
 
+    if key is not None or reverse:
 
-def selection_sort(arr):
+        return _sort_with_key(selection_sort, arr, 0, None, key, reverse)
+
+    if _vectorized_sort(arr):
+
+        return arr
 
     n = len(arr)
 
@@ -20,97 +149,482 @@ def selection_sort(arr):
     return arr
 
 
+def quick_sort(arr, copy=False, key=None, reverse=False):
+    """ Sort arr in place with a three-way quicksort and return it.
 
-# Example usage:
-
-arr = [64, 34, 25, 12, 22, 11, 90]
+    arr can be any mutable sequence (list, array.array, 1-D numpy array).
+    With copy=True the input is left untouched and a new sorted list is
+    returned instead.
+    """
+    if copy:
+        arr = list(arr)
+    if key is not None or reverse:
+        return _sort_with_key(quick_sort, arr, 0, None, key, reverse)
+    if _vectorized_sort(arr):
+        return arr
+    _quick_sort_3way(arr, 0, len(arr))
+    return arr
 
-print("Original array:", arr)
 
-sorted_arr = selection_sort(arr)
+def bubble_sort(arr, key=None, reverse=False):
 
-print("Sorted array:", sorted_arr)
+    if key is not None or reverse:
 
-def quick_sort(arr):
+        return _sort_with_key(bubble_sort, arr, 0, None, key, reverse)
 
-    if len(arr) <= 1:
+    if _vectorized_sort(arr):
 
         return arr
 
-    pivot = arr[len(arr) // 2]
+    n = len(arr)
 
-    left = [x for x in arr if x < pivot]
+    for i in range(n):
 
-    middle = [x for x in arr if x == pivot]
+        for j in range(0, n-i-1):
 
-    right = [x for x in arr if x > pivot]
+            if arr[j] > arr[j+1]:
 
-    return quick_sort(left) + middle + quick_sort(right)
+                arr[j], arr[j+1] = arr[j+1], arr[j]
 
+    return arr
 
 
-# Example usage:
+def insertion_sort(arr, lo=0, hi=None, key=None, reverse=False):
 
-arr = [64, 34, 25, 12, 22, 11, 90]
+    if key is not None or reverse:
 
-print("Original array:", arr)
+        return _sort_with_key(insertion_sort, arr, lo, hi, key, reverse)
 
-sorted_arr = quick_sort(arr)
+    if hi is None:
 
-print("Sorted array:", sorted_arr)
+        hi = len(arr)
 
-def bubble_sort(arr):
+    if _vectorized_sort(arr, lo, hi):
 
-    n = len(arr)
+        return arr
 
-    for i in range(n):
+    for i in range(lo + 1, hi):
 
-        for j in range(0, n-i-1):
+        item = arr[i]
 
-            if arr[j] > arr[j+1]:
+        j = i - 1
 
-                arr[j], arr[j+1] = arr[j+1], arr[j]
+        while j >= lo and item < arr[j]:
 
-    return arr
+            arr[j + 1] = arr[j]
 
-# Example usage:
+            j -= 1
 
-arr = [64, 34, 25, 12, 22, 11, 90]
+        arr[j + 1] = item
 
-print("Original array:", arr)
+    return arr
 
-sorted_arr = bubble_sort(arr)
 
-print("Sorted array:", sorted_arr)
+def binary_insertion_sort(arr, lo=0, hi=None, start=None):
+    """ insertion_sort on a list where arr[lo:start] is already sorted.
+
+    The insertion point is found by bisection and the tail is shifted with
+    one slice assignment, so a run of k items costs O(k log k) comparisons.
+    """
+    if hi is None:
+        hi = len(arr)
+    if start is None or start <= lo:
+        start = lo + 1
+    for i in range(start, hi):
+        item = arr[i]
+        pos = bisect.bisect_right(arr, item, lo, i)
+        if pos < i:
+            arr[pos + 1:i + 1] = arr[pos:i]
+            arr[pos] = item
+    return arr
 
-def insertion_sort(arr):
 
-    for i in range(1, len(arr)):
+def heap_sort(arr, lo=0, hi=None, key=None, reverse=False):
+    """ Sort arr[lo:hi] in place with a binary max-heap """
+    if key is not None or reverse:
+        return _sort_with_key(heap_sort, arr, lo, hi, key, reverse)
+    if hi is None:
+        hi = len(arr)
+    if _vectorized_sort(arr, lo, hi):
+        return arr
+    n = hi - lo
+
+    def sift_down(root, end):
+        while True:
+            child = 2 * root + 1
+            if child >= end:
+                return
+            if child + 1 < end and arr[lo + child] < arr[lo + child + 1]:
+                child += 1
+            if not arr[lo + root] < arr[lo + child]:
+                return
+            arr[lo + root], arr[lo + child] = arr[lo + child], arr[lo + root]
+            root = child
+
+    for start in range(n // 2 - 1, -1, -1):
+        sift_down(start, n)
+    for end in range(n - 1, 0, -1):
+        arr[lo], arr[lo + end] = arr[lo + end], arr[lo]
+        sift_down(0, end)
+    return arr
 
-        key = arr[i]
 
-        j = i - 1
+# Below this size insertion_sort beats partitioning (measured on CPython
+# with random floats, the optimum is flat between 12 and 32).
+INSERTION_CUTOFF = 16
+
+
+def _median_of_three(arr, a, b, c):
+    """ Return the index of the median of arr[a], arr[b], arr[c] """
+    if arr[a] < arr[b]:
+        if arr[b] < arr[c]:
+            return b
+        return c if arr[a] < arr[c] else a
+    if arr[a] < arr[c]:
+        return a
+    return c if arr[b] < arr[c] else b
+
+
+def _ninther(arr, lo, hi):
+    """ Tukey's ninther: median of three medians of three """
+    step = (hi - lo) // 8
+    mid = lo + (hi - lo) // 2
+    low = _median_of_three(arr, lo, lo + step, lo + 2 * step)
+    middle = _median_of_three(arr, mid - step, mid, mid + step)
+    high = _median_of_three(arr, hi - 1 - 2 * step, hi - 1 - step, hi - 1)
+    return _median_of_three(arr, low, middle, high)
+
+
+def _partition_3way(arr, lo, hi):
+    """ Dutch national flag partition of arr[lo:hi] around a median of three
+    (or ninther) pivot.
+
+    Return (lt, gt) such that arr[lo:lt] < pivot, arr[lt:gt] == pivot and
+    arr[gt:hi] > pivot.
+    """
+    if hi - lo > 128:
+        m = _ninther(arr, lo, hi)
+    else:
+        m = _median_of_three(arr, lo, lo + (hi - lo) // 2, hi - 1)
+    pivot = arr[m]
+    lt, i, gt = lo, lo, hi
+    # arr[lo:lt] < pivot, arr[lt:i] == pivot, arr[gt:hi] > pivot
+    while i < gt:
+        x = arr[i]
+        if x < pivot:
+            arr[lt], arr[i] = x, arr[lt]
+            lt += 1
+            i += 1
+        elif pivot < x:
+            gt -= 1
+            arr[gt], arr[i] = x, arr[gt]
+        else:
+            i += 1
+    return lt, gt
+
+
+def _quick_sort_3way(arr, lo, hi):
+    """ Three-way quicksort of arr[lo:hi].
+
+    Items equal to the pivot are gathered in the middle and never touched
+    again, so inputs with many duplicates are cheap. Recursing on the smaller
+    side only bounds the stack depth by log2(n).
+    """
+    while hi - lo > INSERTION_CUTOFF:
+        lt, gt = _partition_3way(arr, lo, hi)
+        if lt - lo < hi - gt:
+            _quick_sort_3way(arr, lo, lt)
+            lo = gt
+        else:
+            _quick_sort_3way(arr, gt, hi)
+            hi = lt
+    insertion_sort(arr, lo, hi)
+
+
+def _partition(arr, lo, hi):
+    """ Hoare partition of arr[lo:hi] around a median-of-three pivot.
+
+    Return p such that every item of arr[lo:p] is <= every item of arr[p:hi]
+    and both sides are non empty.
+    """
+    mid = lo + (hi - lo) // 2
+    m = _median_of_three(arr, lo, mid, hi - 1)
+    pivot = arr[m]
+    i, j = lo - 1, hi
+    while True:
+        i += 1
+        while arr[i] < pivot:
+            i += 1
+        j -= 1
+        while pivot < arr[j]:
+            j -= 1
+        if i >= j:
+            return j + 1
+        arr[i], arr[j] = arr[j], arr[i]
+
+
+def hybrid_sort(arr, lo=0, hi=None, key=None, reverse=False):
+    """ Introsort: in-place quicksort with insertion_sort for small slices
+    and heap_sort when the recursion gets too deep.
+
+    Worst case is O(n log n) and extra memory is O(log n): the function
+    recurses on the smaller side and loops on the larger one.
+    """
+    if key is not None or reverse:
+        return _sort_with_key(hybrid_sort, arr, lo, hi, key, reverse)
+    if hi is None:
+        hi = len(arr)
+    if _vectorized_sort(arr, lo, hi):
+        return arr
+    _introsort(arr, lo, hi, 2 * max(hi - lo, 1).bit_length())
+    return arr
 
-        while j >= 0 and key < arr[j]:
 
-            arr[j + 1] = arr[j]
+def _introsort(arr, lo, hi, depth):
+    while hi - lo > INSERTION_CUTOFF:
+        if depth == 0:
+            heap_sort(arr, lo, hi)
+            return
+        depth -= 1
+        p = _partition(arr, lo, hi)
+        if p - lo < hi - p:
+            _introsort(arr, lo, p, depth)
+            lo = p
+        else:
+            _introsort(arr, p, hi, depth)
+            hi = p
+    insertion_sort(arr, lo, hi)
+
+
+def nth_element(arr, k):
+    """ Rearrange arr in place so that arr[k] is the item a full sort would
+    put there, with arr[:k] <= arr[k] <= arr[k+1:], and return arr.
+
+    Introselect: quickselect on the three-way partition of quick_sort,
+    heap_sort of the remaining slice if the partitions keep being bad.
+    Expected O(n), worst case O(n log n).
+    """
+    n = len(arr)
+    if k < 0:
+        k += n
+    if not 0 <= k < n:
+        raise IndexError("nth_element index out of range")
+    if _vectorized_select(arr, k):
+        return arr
+    lo, hi = 0, n
+    depth = 2 * n.bit_length()
+    while hi - lo > INSERTION_CUTOFF:
+        if depth == 0:
+            heap_sort(arr, lo, hi)
+            return arr
+        depth -= 1
+        lt, gt = _partition_3way(arr, lo, hi)
+        if k < lt:
+            hi = lt
+        elif k >= gt:
+            lo = gt
+        else:
+            return arr
+    insertion_sort(arr, lo, hi)
+    return arr
 
-            j -= 1
 
-        arr[j + 1] = key
+def partial_sort(arr, k):
+    """ Put the k smallest items, sorted, in arr[:k] and return arr.
 
+    The order of arr[k:] is unspecified. O(n + k log k).
+    """
+    n = len(arr)
+    k = min(k, n)
+    if k <= 0:
+        return arr
+    if k < n:
+        nth_element(arr, k - 1)
+    hybrid_sort(arr, 0, k)
     return arr
 
 
+def top_k(iterable, k, key=None, reverse=False):
+    """ Return the k smallest (largest if reverse) items of iterable, sorted.
+
+    Items are streamed through a heap of size k: O(n log k) time and O(k)
+    memory, the iterable is never stored.
+    """
+    if reverse:
+        return heapq.nlargest(k, iterable, key=key)
+    return heapq.nsmallest(k, iterable, key=key)
+
+
+def _vectorized_select(arr, k):
+    """ nth_element with numpy's introselect when arr is numeric """
+    if np is None or not VECTORIZE or len(arr) < VECTORIZE_MIN_SIZE:
+        return False
+    if isinstance(arr, np.ndarray):
+        if arr.ndim != 1 or arr.dtype.kind not in "iuf":
+            return False
+        arr.partition(k)
+        return True
+    if isinstance(arr, array.array):
+        if arr.typecode not in "bBhHiIlLqQfd":
+            return False
+        np.frombuffer(arr, dtype=arr.typecode).partition(k)
+        return True
+    if isinstance(arr, list):
+        values = _numeric_array(arr)
+        if values is None:
+            return False
+        values.partition(k)
+        arr[:] = values.tolist()
+        return True
+    return False
+
+
+# Timsort: natural runs extended to MIN_RUN items, merged with galloping.
+MIN_GALLOP = 7
+
+
+def _min_run(n):
+    """ Run length between 32 and 64 such that n / min_run is close to,
+    but not above, a power of two """
+    r = 0
+    while n >= 64:
+        r |= n & 1
+        n >>= 1
+    return n + r
+
+
+def _count_run(arr, lo, hi):
+    """ Return the end of the run starting at lo, reversing it in place
+    if it is strictly descending (strictness keeps the sort stable) """
+    end = lo + 1
+    if end == hi:
+        return end
+    if arr[end] < arr[lo]:
+        while end < hi and arr[end] < arr[end - 1]:
+            end += 1
+        arr[lo:end] = arr[lo:end][::-1]
+    else:
+        while end < hi and not arr[end] < arr[end - 1]:
+            end += 1
+    return end
+
+
+def _gallop(seq, x, lo, hi, right):
+    """ bisect seq[lo:hi] for x, probing lo+1, lo+3, lo+7... first so that
+    finding an insertion point k items away costs O(log k) comparisons """
+    search = bisect.bisect_right if right else bisect.bisect_left
+    step, prev, probe = 1, lo, lo
+    while probe < hi:
+        if (x < seq[probe]) if right else not (seq[probe] < x):
+            return search(seq, x, prev, probe)
+        prev = probe + 1
+        probe = lo + step
+        step = 2 * step + 1
+    return search(seq, x, prev, hi)
+
+
+def _merge_runs(arr, lo, mid, hi):
+    """ Merge the sorted runs arr[lo:mid] and arr[mid:hi] of a list """
+    # items already at their final place at both ends are left alone
+    lo = _gallop(arr, arr[mid], lo, mid, right=True)
+    if lo == mid:
+        return
+    hi = _gallop(arr, arr[mid - 1], mid, hi, right=False)
+
+    left = arr[lo:mid]
+    n_left = len(left)
+    i, j, k = 0, mid, lo
+    left_wins = right_wins = 0
+    while i < n_left and j < hi:
+        if arr[j] < left[i]:
+            arr[k] = arr[j]
+            j += 1
+            k += 1
+            right_wins += 1
+            left_wins = 0
+            if right_wins >= MIN_GALLOP:
+                end = _gallop(arr, left[i], j, hi, right=False)
+                arr[k:k + end - j] = arr[j:end]
+                k += end - j
+                j = end
+                right_wins = 0
+        else:
+            arr[k] = left[i]
+            i += 1
+            k += 1
+            left_wins += 1
+            right_wins = 0
+            if left_wins >= MIN_GALLOP and j < hi:
+                end = _gallop(left, arr[j], i, n_left, right=True)
+                arr[k:k + end - i] = left[i:end]
+                k += end - i
+                i = end
+                left_wins = 0
+    arr[k:k + n_left - i] = left[i:]
+
+
+def natural_merge_sort(arr, lo=0, hi=None, key=None, reverse=False):
+    """ Timsort-like stable sort, O(n) on already sorted input.
+
+    Ascending and strictly descending runs are detected, short runs are
+    extended to _min_run(n) items with binary_insertion_sort and the runs
+    are merged with galloping, keeping the run lengths on the stack
+    balanced as Timsort does.
+    """
+    if key is not None or reverse:
+        return _sort_with_key(natural_merge_sort, arr, lo, hi, key, reverse)
+    if hi is None:
+        hi = len(arr)
+    if _vectorized_sort(arr, lo, hi):
+        return arr
+    if not isinstance(arr, list):
+        items = natural_merge_sort(list(arr[lo:hi]))
+        for k, item in enumerate(items, lo):
+            arr[k] = item
+        return arr
+
+    min_run = _min_run(hi - lo)
+    runs = []  # (start, length) of the pending runs
+    start = lo
+    while start < hi:
+        end = _count_run(arr, start, hi)
+        if end - start < min_run:
+            forced = min(start + min_run, hi)
+            binary_insertion_sort(arr, start, forced, end)
+            end = forced
+        runs.append((start, end - start))
+        start = end
+        _merge_collapse(arr, runs)
+    while len(runs) > 1:
+        _merge_at(arr, runs, len(runs) - 2)
+    return arr
 
-# Example usage:
 
-arr = [64, 34, 25, 12, 22, 11, 90]
+def _merge_at(arr, runs, i):
+    (start, a), (mid, b) = runs[i], runs[i + 1]
+    _merge_runs(arr, start, mid, mid + b)
+    runs[i:i + 2] = [(start, a + b)]
 
-print("Original array:", arr)
 
-sorted_arr = insertion_sort(arr)
+def _merge_collapse(arr, runs):
+    """ Merge until the run lengths satisfy, from the top of the stack,
+    A > B + C and B > C """
+    while len(runs) > 1:
+        n = len(runs) - 2
+        if (n > 0 and runs[n - 1][1] <= runs[n][1] + runs[n + 1][1]) or \
+                (n > 1 and runs[n - 2][1] <= runs[n - 1][1] + runs[n][1]):
+            if runs[n - 1][1] < runs[n + 1][1]:
+                n -= 1
+        elif runs[n][1] > runs[n + 1][1]:
+            break
+        _merge_at(arr, runs, n)
 
-print("Sorted array:", sorted_arr)
 
+if __name__ == "__main__":
 
+    for sort in [selection_sort, quick_sort, bubble_sort, insertion_sort,
+                 heap_sort, hybrid_sort, natural_merge_sort]:
+        arr = [64, 34, 25, 12, 22, 11, 90]
+        print("Original array:", arr)
+        sorted_arr = sort(arr)
+        print("Sorted array:", sorted_arr)
@@ -0,0 +1,226 @@
+"""
+Compare the functions of sorting_algorithms.py on several input distributions.
+
+    python sorting_benchmark.py
+    python sorting_benchmark.py --sizes 1000 50000 --inputs random sorted \
+        --algorithms quick_sort hybrid_sort --counts
+
+The quadratic sorts are only timed on small inputs. The numpy dispatch is
+switched off so that the Python algorithms are measured, except in the
+"numpy" column which times the vectorised path.
+
+With --counts every algorithm is also run once through `instrument`, which
+counts comparisons, item moves, recursion depth and peak memory. The
+sorting functions themselves are not modified: the items are wrapped in
+counting proxies and the list in a counting list, so there is no cost at
+all when instrumentation is not used.
+"""
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+
+import sorting_algorithms
+from sorting_algorithms import (selection_sort, bubble_sort, insertion_sort,
+                                quick_sort, heap_sort, hybrid_sort,
+                                natural_merge_sort)
+
+
+def random_input(n):
+    return [random.random() for _ in range(n)]
+
+
+def sorted_input(n):
+    return list(range(n))
+
+
+def reversed_input(n):
+    return list(range(n, 0, -1))
+
+
+def nearly_sorted_input(n):
+    """ sorted with 1% of the items moved at random """
+    arr = list(range(n))
+    for _ in range(n // 100):
+        i, j = random.randrange(n), random.randrange(n)
+        arr[i], arr[j] = arr[j], arr[i]
+    return arr
+
+
+def duplicates_input(n):
+    return [random.randrange(10) for _ in range(n)]
+
+
+DISTRIBUTIONS = {"random": random_input,
+                 "sorted": sorted_input,
+                 "reversed": reversed_input,
+                 "nearly_sorted": nearly_sorted_input,
+                 "duplicates": duplicates_input}
+
+QUADRATIC = [selection_sort, bubble_sort, insertion_sort]
+LOGLINEAR = [quick_sort, heap_sort, hybrid_sort, natural_merge_sort, sorted]
+
+
+def numpy(arr):
+    """ hybrid_sort with the numpy dispatch enabled """
+    vectorize = sorting_algorithms.VECTORIZE
+    sorting_algorithms.VECTORIZE = True
+    try:
+        return hybrid_sort(arr)
+    finally:
+        sorting_algorithms.VECTORIZE = vectorize
+
+
+ALGORITHMS = {sort.__name__: sort for sort in QUADRATIC + LOGLINEAR + [numpy]}
+
+
+class SortStats:
+    """ Operation counts of one sort call """
+
+    def __init__(self):
+        self.comparisons = 0
+        self.moves = 0
+        self.recursion_depth = 0
+        self.peak_memory = 0
+
+    def __repr__(self):
+        return (f"SortStats(comparisons={self.comparisons}, "
+                f"moves={self.moves}, "
+                f"recursion_depth={self.recursion_depth}, "
+                f"peak_memory={self.peak_memory})")
+
+
+class _Counted:
+    """ Item wrapper counting the comparisons made by the sort """
+    __slots__ = ("value", "stats")
+
+    def __init__(self, value, stats):
+        self.value = value
+        self.stats = stats
+
+    def __lt__(self, other):
+        self.stats.comparisons += 1
+        return self.value < other.value
+
+    def __gt__(self, other):
+        self.stats.comparisons += 1
+        return self.value > other.value
+
+    def __eq__(self, other):
+        self.stats.comparisons += 1
+        return self.value == other.value
+
+
+class _CountedList(list):
+    """ List counting the item writes (a swap is two moves) """
+
+    def __init__(self, items, stats):
+        super().__init__(items)
+        self.stats = stats
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            self.stats.moves += len(range(*index.indices(len(self))))
+        else:
+            self.stats.moves += 1
+        super().__setitem__(index, value)
+
+
+def instrument(sort, data, callback=None):
+    """ Run sort on a copy of data and return its SortStats.
+
+    recursion_depth is the deepest nesting of a single function of
+    sorting_algorithms, peak_memory the peak of the memory allocated during
+    the call, in bytes. If given, callback is called with the stats.
+    """
+    stats = SortStats()
+    arr = _CountedList([_Counted(x, stats) for x in data], stats)
+    module = sorting_algorithms.__file__
+    depths = {}
+
+    def profile(frame, event, arg):
+        if event not in ("call", "return") or \
+                frame.f_code.co_filename != module:
+            return
+        code = frame.f_code
+        depth = depths.get(code, 0) + (1 if event == "call" else -1)
+        depths[code] = depth
+        stats.recursion_depth = max(stats.recursion_depth, depth)
+
+    tracemalloc.start()
+    sys.setprofile(profile)
+    try:
+        sort(arr)
+    finally:
+        sys.setprofile(None)
+        stats.peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    if callback is not None:
+        callback(stats)
+    return stats
+
+
+def timeit(sort, data, repeat=3):
+    """ Return the best wall time of sort over copies of data """
+    best = float("inf")
+    for _ in range(repeat):
+        arr = data[:]
+        start = time.perf_counter()
+        sort(arr)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark(sizes=(1000, 100000), inputs=tuple(DISTRIBUTIONS),
+              algorithms=tuple(ALGORITHMS), quadratic_max=2000, repeat=3,
+              counts=False):
+    # the pure Python sorts are measured: the numpy dispatch is turned off,
+    # then restored for the caller
+    vectorize = sorting_algorithms.VECTORIZE
+    sorting_algorithms.VECTORIZE = False
+    try:
+        header = f"{'input':>13} {'n':>8} {'algorithm':>18} {'time':>10}"
+        if counts:
+            header += (f" {'comparisons':>12} {'moves':>12} {'depth':>6}"
+                       f" {'memory':>10}")
+        print(header)
+        for name in inputs:
+            for n in sizes:
+                data = DISTRIBUTIONS[name](n)
+                for algorithm in algorithms:
+                    sort = ALGORITHMS[algorithm]
+                    if sort in QUADRATIC and n > quadratic_max:
+                        continue
+                    row = (f"{name:>13} {n:8d} {algorithm:>18}"
+                           f" {timeit(sort, data, repeat):10.6f}")
+                    if counts and sort is not numpy:
+                        stats = instrument(sort, data)
+                        row += (f" {stats.comparisons:12d} {stats.moves:12d}"
+                                f" {stats.recursion_depth:6d}"
+                                f" {stats.peak_memory:10d}")
+                    print(row)
+    finally:
+        sorting_algorithms.VECTORIZE = vectorize
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--inputs", nargs="+", choices=list(DISTRIBUTIONS),
+                        default=list(DISTRIBUTIONS))
+    parser.add_argument("--algorithms", nargs="+", choices=list(ALGORITHMS),
+                        default=list(ALGORITHMS))
+    parser.add_argument("--quadratic-max", type=int, default=2000,
+                        help="largest input given to the O(n^2) sorts")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--counts", action="store_true",
+                        help="also count comparisons, moves, depth, memory")
+    args = parser.parse_args(argv)
+    benchmark(args.sizes, args.inputs, args.algorithms, args.quadratic_max,
+              args.repeat, args.counts)
+
+
+if __name__ == "__main__":
+    main()